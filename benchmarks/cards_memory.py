@@ -0,0 +1,159 @@
+"""
+Card store memory benchmark.
+
+Measures the per-card memory (tracemalloc) of the CardsCoordinator card records for a large card
+population, against the dict-per-card layout used before the compact card store.
+
+Usage: python3 benchmarks/cards_memory.py [--cards 20000] [--controllers 1 10]
+"""
+
+import argparse
+import datetime
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from custom_components.uhppoted.const import CONF_CONTROLLERS
+from custom_components.uhppoted.const import CONF_CONTROLLER_ID
+from custom_components.uhppoted.const import CONF_CONTROLLER_SERIAL_NUMBER
+from custom_components.uhppoted.const import CONF_DOORS
+from custom_components.uhppoted.const import CONF_DOOR_ID
+from custom_components.uhppoted.const import CONF_DOOR_CONTROLLER
+from custom_components.uhppoted.const import CONF_DOOR_NUMBER
+from custom_components.uhppoted.const import ATTR_AVAILABLE
+from custom_components.uhppoted.const import ATTR_CARD_STARTDATE
+from custom_components.uhppoted.const import ATTR_CARD_ENDDATE
+from custom_components.uhppoted.const import ATTR_CARD_PERMISSIONS
+from custom_components.uhppoted.const import ATTR_CARD_PIN
+
+from custom_components.uhppoted.coordinators.db import ACL
+from custom_components.uhppoted.coordinators.db import CardRecord
+
+_BASE = 10000000
+_PIN_RATIO = 0.25
+_RANGES = 8
+
+
+def options(controllers):
+    options = {
+        CONF_CONTROLLERS: [],
+        CONF_DOORS: [],
+    }
+
+    for ix in range(controllers):
+        name = f'controller-{ix+1}'
+        options[CONF_CONTROLLERS].append({
+            CONF_CONTROLLER_ID: name,
+            CONF_CONTROLLER_SERIAL_NUMBER: 405419896 + ix,
+        })
+
+        for door in [1, 2, 3, 4]:
+            options[CONF_DOORS].append({
+                CONF_DOOR_ID: f'door-{ix+1}.{door}',
+                CONF_DOOR_CONTROLLER: name,
+                CONF_DOOR_NUMBER: door,
+            })
+
+    return options
+
+
+def responses(cards, controllers, seed=1):
+    # NTS: new date objects for every response, as returned by the driver
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    ranges = [(rng.randint(0, 365), rng.randint(365, 3 * 365)) for _ in range(_RANGES)]
+
+    for card in range(_BASE, _BASE + cards):
+        (start, end) = ranges[rng.randrange(len(ranges))]
+        pin = rng.randint(1, 999999) if rng.random() < _PIN_RATIO else 0
+        records = {}
+
+        for ix in range(controllers):
+            doors = [d for d in [1, 2, 3, 4] if rng.random() < 0.5]
+            records[405419896 + ix] = (today - datetime.timedelta(days=start), today + datetime.timedelta(days=end),
+                                       doors, pin)
+
+        yield (card, records)
+
+
+def compact(cards, controllers):
+    acl = ACL(options(controllers))
+    state = {}
+
+    for (card, records) in responses(cards, controllers):
+        record = state[card] = CardRecord(acl)
+        record.update({k: (start, end, acl.mask(k, doors), pin) for k, (start, end, doors, pin) in records.items()})
+
+    return state
+
+
+def legacy(cards, controllers):
+    state = {}
+
+    for (card, records) in responses(cards, controllers):
+        start_date = None
+        end_date = None
+        permissions = []
+        PIN = None
+
+        for k, (start, end, doors, pin) in records.items():
+            if start and (not start_date or start < start_date):
+                start_date = start
+
+            if end != None and (not end_date or end > end_date):
+                end_date = end
+
+            permissions.extend([f'door-{k - 405419896 + 1}.{d}' for d in doors])
+
+            if pin > 0:
+                PIN = pin
+
+        state[card] = {
+            ATTR_CARD_STARTDATE: start_date,
+            ATTR_CARD_ENDDATE: end_date,
+            ATTR_CARD_PERMISSIONS: sorted(permissions),
+            ATTR_CARD_PIN: PIN,
+            ATTR_AVAILABLE: True,
+        }
+
+    return state
+
+
+def measure(f, cards, controllers):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        state = f(cards, controllers)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    size = sum(v.size_diff for v in after.compare_to(before, 'filename'))
+    del state
+
+    return size / cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='card store memory benchmark')
+    parser.add_argument('--cards', type=int, default=20000)
+    parser.add_argument('--controllers', type=int, nargs='+', default=[1, 10])
+    args = parser.parse_args()
+
+    print(f'{"controllers":>12}  {"cards":>8}  {"legacy (B/card)":>16}  {"compact (B/card)":>17}  {"saved":>6}')
+    for controllers in args.controllers:
+        before = measure(legacy, args.cards, controllers)
+        after = measure(compact, args.cards, controllers)
+        saved = 100.0 * (before - after) / before
+
+        print(f'{controllers:>12}  {args.cards:>8}  {before:>16.0f}  {after:>17.0f}  {saved:>5.0f}%')
+
+
+if __name__ == '__main__':
+    main()
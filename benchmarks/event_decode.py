@@ -0,0 +1,154 @@
+"""
+Event decoder micro-benchmark.
+
+Compares EventListener.decode (struct based) against the previous decode path (uhppoted decode.event
+followed by a copy into an Event), after checking that both decoders return the same event, relays,
+buttons and door open states for a set of random event packets. EventListener.decode only decodes the BCD
+event timestamp when it is first used, so it is also timed with the timestamp read.
+
+Requires Home Assistant and uhppoted (pip install homeassistant uhppoted).
+
+Usage: python3 benchmarks/event_decode.py [--packets 1000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import timeit
+
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from uhppoted import decode
+
+from custom_components.uhppoted.coordinators.events import EventListener
+
+from fake_controller import Event
+from fake_controller import event_packet
+
+CONTROLLER = 405419896
+
+
+@dataclass
+class LegacyEvent:
+    controller: int
+    index: int
+    event_type: int
+    access_granted: bool
+    door: int
+    direction: int
+    card: int
+    timestamp: datetime.datetime
+    reason: int
+
+
+def legacy(packet):
+    evt = decode.event(packet)
+
+    # yapf: disable
+    return (LegacyEvent(evt.controller,
+                        evt.event_index,
+                        evt.event_type,
+                        evt.event_access_granted,
+                        evt.event_door,
+                        evt.event_direction,
+                        evt.event_card,
+                        evt.event_timestamp,
+                        evt.event_reason),
+            evt.relays,
+            {
+                1: evt.door_1_button,
+                2: evt.door_2_button,
+                3: evt.door_3_button,
+                4: evt.door_4_button,
+            },
+            {
+                1: evt.door_1_open,
+                2: evt.door_2_open,
+                3: evt.door_3_open,
+                4: evt.door_4_open,
+            })
+    # yapf: enable
+
+
+def packets(n, seed=1):
+    rng = random.Random(seed)
+    now = datetime.datetime.now().replace(microsecond=0)
+    packets = []
+
+    for index in range(1, n + 1):
+        timestamp = now - datetime.timedelta(seconds=rng.randint(0, 365 * 86400))
+        event_type = rng.choice([1, 2, 3])
+        granted = rng.random() < 0.5
+        door = rng.randint(1, 4)
+        direction = rng.choice([1, 2])
+        card = rng.randint(10000000, 20000000)
+        reason = rng.randint(1, 44)
+
+        e = Event(index, event_type, granted, door, direction, card, timestamp, reason)
+        p = bytearray(event_packet(CONTROLLER, e, rng.randint(0, 15)))
+
+        for offset in range(28, 36):
+            p[offset] = rng.randint(0, 1)
+
+        # ... includes some packets with a zero (invalid) timestamp
+        if index % 50 == 0:
+            p[20:27] = bytes(7)
+
+        packets.append(bytes(p))
+
+    return packets
+
+
+def parity(decoder, packets):
+    fields = ['controller', 'index', 'event_type', 'access_granted', 'door', 'direction', 'card', 'timestamp', 'reason']
+
+    for p in packets:
+        (e, relays, buttons, doors) = decoder(p)
+        (expected, relays_, buttons_, doors_) = legacy(p)
+
+        for field in fields:
+            if getattr(e, field) != getattr(expected, field):
+                raise AssertionError(f'{field} mismatch ({getattr(e, field)} != {getattr(expected, field)})')
+
+        if (relays, buttons, doors) != (relays_, buttons_, doors_):
+            raise AssertionError(f'relays/buttons/doors mismatch ({relays, buttons, doors})')
+
+
+def measure(decoder, packets, repeat):
+
+    def f():
+        for p in packets:
+            decoder(p)
+
+    return min(timeit.repeat(f, number=1, repeat=repeat)) / len(packets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='event decoder micro-benchmark')
+    parser.add_argument('--packets', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    listener = EventListener(None)
+    p = packets(args.packets)
+
+    parity(listener.decode, p)
+
+    before = measure(legacy, p, args.repeat)
+    after = measure(listener.decode, p, args.repeat)
+    timestamp = measure(lambda packet: listener.decode(packet)[0].timestamp, p, args.repeat)
+
+    print(f'parity: OK ({len(p)} packets)')
+    print(f'{"decoder":<32} {"us/packet":>10}')
+    print(f'{"decode.event + copy":<32} {1e6 * before:>10.2f}')
+    print(f'{"EventListener.decode":<32} {1e6 * after:>10.2f}  ({before / after:.1f}x)')
+    print(f'{"EventListener.decode + timestamp":<32} {1e6 * timestamp:>10.2f}  ({before / timestamp:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Event fan-out benchmark.
+
+Sends card swipe events from a local fake controller to the event listener at a fixed rate (200 events/s by
+default) and measures the delivery latency (controller send -> entity cursor drain) and the loss for the
+controller, door and card event streams subscribed to the EventsCoordinator.
+
+Requires Home Assistant and uhppoted (pip install homeassistant uhppoted).
+
+Usage: python3 benchmarks/event_fanout.py [--rate 200] [--duration 10] [--cards 50] [--rate-limit 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.uhppoted.const import DOMAIN
+from custom_components.uhppoted.const import CONF_BIND_ADDR
+from custom_components.uhppoted.const import CONF_BROADCAST_ADDR
+from custom_components.uhppoted.const import CONF_LISTEN_ADDR
+from custom_components.uhppoted.const import CONF_EVENTS_DEST_ADDR
+from custom_components.uhppoted.const import CONF_DEBUG
+from custom_components.uhppoted.const import CONF_EVENTS_BATCH
+from custom_components.uhppoted.const import CONF_EVENTS_QUEUE_SIZE
+from custom_components.uhppoted.const import CONF_EVENTS_RATE_LIMIT
+from custom_components.uhppoted.const import CONF_EVENTS_OVERLOAD
+from custom_components.uhppoted.const import CONF_CONTROLLERS
+from custom_components.uhppoted.const import CONF_CONTROLLER_UNIQUE_ID
+from custom_components.uhppoted.const import CONF_CONTROLLER_ID
+from custom_components.uhppoted.const import CONF_CONTROLLER_SERIAL_NUMBER
+from custom_components.uhppoted.const import CONF_CONTROLLER_ADDR
+from custom_components.uhppoted.const import CONF_CONTROLLER_PORT
+from custom_components.uhppoted.const import CONF_CONTROLLER_PROTOCOL
+from custom_components.uhppoted.const import CONF_DOORS
+from custom_components.uhppoted.const import CONF_DOOR_UNIQUE_ID
+from custom_components.uhppoted.const import CONF_DOOR_ID
+from custom_components.uhppoted.const import CONF_DOOR_CONTROLLER
+from custom_components.uhppoted.const import CONF_DOOR_NUMBER
+from custom_components.uhppoted.const import CONF_CARDS
+
+from custom_components.uhppoted.coordinators.coordinators import Coordinators
+
+from fake_controller import FakeController
+
+CONTROLLER = 405419896
+BASE_CARD = 10058400
+
+
+def options(port, listener):
+    # yapf: disable
+    return {
+        CONF_BIND_ADDR: '0.0.0.0',
+        CONF_BROADCAST_ADDR: '255.255.255.255:60000',
+        CONF_LISTEN_ADDR: f'127.0.0.1:{listener}',
+        CONF_EVENTS_DEST_ADDR: f'127.0.0.1:{listener}',
+        CONF_DEBUG: False,
+        CONF_CONTROLLERS: [{
+            CONF_CONTROLLER_UNIQUE_ID: 'benchmark-controller',
+            CONF_CONTROLLER_ID: 'Alpha',
+            CONF_CONTROLLER_SERIAL_NUMBER: CONTROLLER,
+            CONF_CONTROLLER_ADDR: '127.0.0.1',
+            CONF_CONTROLLER_PORT: port,
+            CONF_CONTROLLER_PROTOCOL: 'UDP',
+        }],
+        CONF_DOORS: [{
+            CONF_DOOR_UNIQUE_ID: f'benchmark-door-{door}',
+            CONF_DOOR_ID: f'Door {door}',
+            CONF_DOOR_CONTROLLER: 'Alpha',
+            CONF_DOOR_NUMBER: door,
+        } for door in [1, 2, 3, 4]],
+        CONF_CARDS: [],
+    }
+    # yapf: enable
+
+
+class Cursor:
+    '''
+    Stand-in for an event entity: drains the events after its cursor when woken up by the coordinator.
+    '''
+
+    def __init__(self, coordinator, sent, controller=None, door=None, card=None):
+        self._coordinator = coordinator
+        self._sent = sent
+        self._key = {'controller': controller, 'door': door, 'card': card}
+        self._cursor = coordinator.sequence()
+        self.received = set()
+        self.latency = []
+        self.unsubscribe = coordinator.subscribe(self.drain, **self._key)
+
+    def drain(self):
+        now = time.perf_counter()
+        for (seq, e) in self._coordinator.events(self._cursor, **self._key):
+            self._cursor = seq
+            sent = self._sent.get(e.index, None)
+            if sent != None and e.card and e.index not in self.received:
+                self.received.add(e.index)
+                self.latency.append(1000.0 * (now - sent))
+
+
+async def generate(controller, sent, expected, rate, duration, cards, seed=1):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    for i in range(int(rate * duration)):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        card = BASE_CARD + rng.randrange(cards)
+        door = rng.choice([1, 2, 3, 4])
+        sent[len(controller.events) + 1] = time.perf_counter()
+        e = controller.swipe(card, door)
+
+        for key in [('controller', CONTROLLER), ('door', door), ('card', card)]:
+            expected.setdefault(key, set()).add(e.index)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+
+    v = sorted(values)
+    return v[min(len(v) - 1, int(q * len(v)))]
+
+
+def summarise(cursors, expected):
+    summary = {}
+    for kind in ['controller', 'door', 'card']:
+        latency = []
+        delivered = 0
+        total = 0
+        for (key, cursor) in cursors.items():
+            if key[0] == kind:
+                latency.extend(cursor.latency)
+                delivered += len(cursor.received & expected.get(key, set()))
+                total += len(expected.get(key, set()))
+
+        summary[kind] = {
+            'streams': len([k for k in cursors if k[0] == kind]),
+            'expected': total,
+            'delivered': delivered,
+            'lost': total - delivered,
+            'p50': percentile(latency, 0.50),
+            'p95': percentile(latency, 0.95),
+            'p99': percentile(latency, 0.99),
+            'max': max(latency) if latency else None,
+        }
+
+    return summary
+
+
+def report(args, summary, ingress):
+    print(f'{args.rate} events/s for {args.duration}s ({args.cards} cards, rate limit {args.rate_limit}/s, '
+          f'{args.policy}, latency ms)')
+    print(f'  {"stream":<12} {"streams":>7} {"expected":>9} {"lost":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}')
+    for (kind, v) in summary.items():
+        p = [f'{v[q]:>8.2f}' if v[q] != None else f'{"-":>8}' for q in ['p50', 'p95', 'p99', 'max']]
+        print(f'  {kind:<12} {v["streams"]:>7} {v["expected"]:>9} {v["lost"]:>6} {" ".join(p)}')
+    print()
+    print(f'ingress: {json.dumps(ingress)}')
+
+
+async def main(args):
+    config = options(args.port, args.listener)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hass = HomeAssistant(tmp)
+        hass.data[DOMAIN] = {
+            CONF_EVENTS_BATCH: args.batch,
+            CONF_EVENTS_QUEUE_SIZE: args.queue,
+            CONF_EVENTS_RATE_LIMIT: args.rate_limit,
+            CONF_EVENTS_OVERLOAD: args.policy,
+        }
+
+        controller = FakeController(CONTROLLER, ('127.0.0.1', args.listener))
+        controller.serve('127.0.0.1', args.port)
+
+        Coordinators.initialise(hass, 'benchmark', config)
+        events = Coordinators.events('benchmark')
+        unsubscribe = [events.async_add_listener(lambda: None, CONTROLLER)]
+
+        sent = {}
+        expected = {}
+        cursors = {}
+
+        try:
+            await events.async_refresh()
+
+            cursors[('controller', CONTROLLER)] = Cursor(events, sent, controller=CONTROLLER)
+            for door in [1, 2, 3, 4]:
+                cursors[('door', door)] = Cursor(events, sent, controller=CONTROLLER, door=door)
+            for card in range(BASE_CARD, BASE_CARD + args.cards):
+                cursors[('card', card)] = Cursor(events, sent, card=card)
+
+            unsubscribe.extend([v.unsubscribe for v in cursors.values()])
+
+            await asyncio.wrap_future(
+                controller.submit(generate(controller, sent, expected, args.rate, args.duration, args.cards)))
+
+            # ... let the last batch (and any backlog fetch) settle
+            await asyncio.sleep(args.settle)
+
+            summary = summarise(cursors, expected)
+            if args.json:
+                print(json.dumps({'streams': summary, 'ingress': events.ingress()}, indent=2))
+            else:
+                report(args, summary, events.ingress())
+
+        finally:
+            for f in unsubscribe:
+                f()
+
+            await Coordinators.async_unload(hass, 'benchmark')
+            controller.shutdown()
+            await hass.async_stop(force=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='event fan-out benchmark')
+    parser.add_argument('--rate', type=int, default=200, help='events/s sent by the fake controller')
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    parser.add_argument('--cards', type=int, default=50, help='number of cards (and card streams)')
+    parser.add_argument('--batch', type=int, default=25, help='event batch window (milliseconds)')
+    parser.add_argument('--queue', type=int, default=1024, help='event queue size')
+    parser.add_argument('--rate-limit', type=float, default=0, help='per-controller event rate limit (0 = none)')
+    parser.add_argument('--policy', default='drop-oldest', choices=['drop-oldest', 'collapse', 'pause'])
+    parser.add_argument('--settle', type=float, default=2, help='seconds to wait for the last events')
+    parser.add_argument('--port', type=int, default=60110, help='fake controller UDP port')
+    parser.add_argument('--listener', type=int, default=60111, help='event listener UDP port')
+    parser.add_argument('--json', action='store_true')
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,213 @@
+"""
+Minimal fake UHPPOTE controller for the benchmarks.
+
+Answers the requests issued by the coordinators (get-status, open-door, get-event, etc.) on a local UDP
+port and sends event packets to the event listener. Responses use the v6.62 64 byte packet layout.
+
+NTS: the coordinators block the Home Assistant event loop while polling, so serve() runs the fake
+     controller on its own event loop in a background thread.
+"""
+
+import asyncio
+import datetime
+import ipaddress
+import struct
+import threading
+
+SOM = 0x17
+
+GET_STATUS = 0x20
+GET_TIME = 0x32
+OPEN_DOOR = 0x40
+GET_CARD = 0x5a
+GET_DOOR = 0x82
+RECORD_SPECIAL_EVENTS = 0x8e
+SET_LISTENER = 0x90
+GET_LISTENER = 0x92
+GET_CONTROLLER = 0x94
+GET_EVENT = 0xb0
+
+REASON_SWIPE = 1
+REASON_REMOTE_OPEN = 44
+
+_MASK = {1: 0x01, 2: 0x02, 3: 0x04, 4: 0x08}
+
+
+def bcd(s):
+    return bytes.fromhex(s)
+
+
+def packet(function_code, controller):
+    p = bytearray(64)
+    p[0] = SOM
+    p[1] = function_code
+    struct.pack_into('<I', p, 4, controller)
+
+    return p
+
+
+class Event:
+
+    def __init__(self, index, event_type, granted, door, direction, card, timestamp, reason):
+        self.index = index
+        self.event_type = event_type
+        self.granted = granted
+        self.door = door
+        self.direction = direction
+        self.card = card
+        self.timestamp = timestamp
+        self.reason = reason
+
+
+def event_packet(controller, event, relays=0):
+    now = datetime.datetime.now()
+
+    p = packet(GET_STATUS, controller)
+    struct.pack_into('<IBBBBI', p, 8, event.index, event.event_type, event.granted, event.door, event.direction,
+                     event.card)
+    p[20:27] = bcd(event.timestamp.strftime('%Y%m%d%H%M%S'))
+    p[27] = event.reason
+    p[37:40] = bcd(now.strftime('%H%M%S'))
+    struct.pack_into('<I', p, 40, event.index)
+    p[49] = relays
+    p[51:54] = bcd(now.strftime('%y%m%d'))
+
+    return bytes(p)
+
+
+class FakeController(asyncio.DatagramProtocol):
+
+    def __init__(self, controller, listener, relock=0.05):
+        self.controller = controller
+        self.listener = listener
+        self.relock = relock
+        self.relays = 0
+        self.events = []
+        self.requests = {}
+        self._transport = None
+        self._loop = None
+
+    async def start(self, addr, port):
+        self._loop = asyncio.get_running_loop()
+        (self._transport, _) = await self._loop.create_datagram_endpoint(lambda: self, local_addr=(addr, port))
+
+    def close(self):
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+
+    def serve(self, addr, port):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start(addr, port))
+            ready.set()
+            loop.run_forever()
+            loop.close()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+
+    def shutdown(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def call(self, f, *args):
+        self._loop.call_soon_threadsafe(f, *args)
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def event(self, event_type, granted, door, direction, card, reason):
+        index = len(self.events) + 1
+        e = Event(index, event_type, granted, door, direction, card, datetime.datetime.now(), reason)
+        self.events.append(e)
+
+        if self._transport and self.listener:
+            self._transport.sendto(self._event_packet(e), self.listener)
+
+        return e
+
+    def swipe(self, card, door, granted=True):
+        return self.event(1, granted, door, 1, card, REASON_SWIPE)
+
+    def datagram_received(self, request, addr):
+        if len(request) != 64 or request[0] != SOM:
+            return
+
+        function_code = request[1]
+        self.requests[function_code] = self.requests.get(function_code, 0) + 1
+
+        reply = self._reply(function_code, request)
+        if reply and self._transport:
+            self._transport.sendto(bytes(reply), addr)
+
+        if function_code == OPEN_DOOR:
+            door = request[8]
+            self.event(2, True, door, 1, 0, REASON_REMOTE_OPEN)
+            self._loop.call_later(self.relock, self._lock, door)
+
+    def _reply(self, function_code, request):
+        p = packet(function_code, self.controller)
+
+        if function_code == GET_STATUS:
+            e = self.events[-1] if self.events else None
+            if e:
+                return self._event_packet(e)
+
+            p[37:40] = bcd(datetime.datetime.now().strftime('%H%M%S'))
+            p[49] = self.relays
+            p[51:54] = bcd(datetime.datetime.now().strftime('%y%m%d'))
+
+        elif function_code == OPEN_DOOR:
+            door = request[8]
+            self.relays |= _MASK.get(door, 0)
+            p[8] = 1
+
+        elif function_code == GET_EVENT:
+            index = struct.unpack_from('<I', request, 8)[0]
+            if 0 < index <= len(self.events):
+                e = self.events[index - 1]
+                struct.pack_into('<IBBBBI', p, 8, e.index, e.event_type, e.granted, e.door, e.direction, e.card)
+                p[20:27] = bcd(e.timestamp.strftime('%Y%m%d%H%M%S'))
+                p[27] = e.reason
+
+        elif function_code == GET_DOOR:
+            p[8] = request[8]
+            p[9] = 3
+            p[10] = 5
+
+        elif function_code == GET_LISTENER:
+            if self.listener:
+                p[8:12] = ipaddress.IPv4Address(self.listener[0]).packed
+                struct.pack_into('<H', p, 12, self.listener[1])
+
+        elif function_code in [RECORD_SPECIAL_EVENTS, SET_LISTENER]:
+            p[8] = 1
+
+        elif function_code == GET_TIME:
+            p[8:15] = bcd(datetime.datetime.now().strftime('%Y%m%d%H%M%S'))
+
+        elif function_code == GET_CONTROLLER:
+            p[8:12] = ipaddress.IPv4Address('127.0.0.1').packed
+            p[12:16] = ipaddress.IPv4Address('255.255.255.0').packed
+            p[26:28] = bcd('0892')
+            p[28:32] = bcd('20240101')
+
+        elif function_code == GET_CARD:
+            # ... card not found
+            pass
+
+        return p
+
+    def _lock(self, door):
+        self.relays &= ~_MASK.get(door, 0)
+
+    def _event_packet(self, e):
+        return event_packet(self.controller, e, self.relays)
@@ -0,0 +1,197 @@
+"""
+Door unlock latency benchmark.
+
+Drives DoorsCoordinator.async_unlock_door against a local fake controller, first with the coordinators
+idle and then with all the coordinators polling continuously, and prints the unlock latency histograms
+(resolve, open-door, confirm, state-write) as p50/p95/p99. The percentiles are histogram bucket
+bounds (clamped to the observed maximum), so the mean is reported as well.
+
+Requires Home Assistant and uhppoted (pip install homeassistant uhppoted).
+
+Usage: python3 benchmarks/unlock_latency.py [--unlocks 200] [--port 60100] [--listener 60101]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.uhppoted.const import DOMAIN
+from custom_components.uhppoted.const import CONF_BIND_ADDR
+from custom_components.uhppoted.const import CONF_BROADCAST_ADDR
+from custom_components.uhppoted.const import CONF_LISTEN_ADDR
+from custom_components.uhppoted.const import CONF_EVENTS_DEST_ADDR
+from custom_components.uhppoted.const import CONF_DEBUG
+from custom_components.uhppoted.const import CONF_EVENTS_BATCH
+from custom_components.uhppoted.const import CONF_CONTROLLERS
+from custom_components.uhppoted.const import CONF_CONTROLLER_UNIQUE_ID
+from custom_components.uhppoted.const import CONF_CONTROLLER_ID
+from custom_components.uhppoted.const import CONF_CONTROLLER_SERIAL_NUMBER
+from custom_components.uhppoted.const import CONF_CONTROLLER_ADDR
+from custom_components.uhppoted.const import CONF_CONTROLLER_PORT
+from custom_components.uhppoted.const import CONF_CONTROLLER_PROTOCOL
+from custom_components.uhppoted.const import CONF_DOORS
+from custom_components.uhppoted.const import CONF_DOOR_UNIQUE_ID
+from custom_components.uhppoted.const import CONF_DOOR_ID
+from custom_components.uhppoted.const import CONF_DOOR_CONTROLLER
+from custom_components.uhppoted.const import CONF_DOOR_NUMBER
+from custom_components.uhppoted.const import CONF_CARDS
+from custom_components.uhppoted.const import CONF_CARD_UNIQUE_ID
+from custom_components.uhppoted.const import CONF_CARD_NUMBER
+from custom_components.uhppoted.const import CONF_CARD_NAME
+
+from custom_components.uhppoted.coordinators.coordinators import Coordinators
+from custom_components.uhppoted.coordinators.metrics import Metrics
+
+from fake_controller import FakeController
+
+CONTROLLER = 405419896
+CARDS = 10
+_STAGES = ['unlock.resolve', 'unlock.open-door', 'unlock.confirm', 'unlock.state-write', 'unlock.unconfirmed']
+
+
+def options(port, listener):
+    # yapf: disable
+    return {
+        CONF_BIND_ADDR: '0.0.0.0',
+        CONF_BROADCAST_ADDR: '255.255.255.255:60000',
+        CONF_LISTEN_ADDR: f'127.0.0.1:{listener}',
+        CONF_EVENTS_DEST_ADDR: f'127.0.0.1:{listener}',
+        CONF_DEBUG: False,
+        CONF_CONTROLLERS: [{
+            CONF_CONTROLLER_UNIQUE_ID: 'benchmark-controller',
+            CONF_CONTROLLER_ID: 'Alpha',
+            CONF_CONTROLLER_SERIAL_NUMBER: CONTROLLER,
+            CONF_CONTROLLER_ADDR: '127.0.0.1',
+            CONF_CONTROLLER_PORT: port,
+            CONF_CONTROLLER_PROTOCOL: 'UDP',
+        }],
+        CONF_DOORS: [{
+            CONF_DOOR_UNIQUE_ID: f'benchmark-door-{door}',
+            CONF_DOOR_ID: f'Door {door}',
+            CONF_DOOR_CONTROLLER: 'Alpha',
+            CONF_DOOR_NUMBER: door,
+        } for door in [1, 2, 3, 4]],
+        CONF_CARDS: [{
+            CONF_CARD_UNIQUE_ID: f'benchmark-card-{card}',
+            CONF_CARD_NUMBER: card,
+            CONF_CARD_NAME: f'Card {card}',
+        } for card in range(10058400, 10058400 + CARDS)],
+    }
+    # yapf: enable
+
+
+async def unlock(doors, door, timeout=10):
+    key = (CONTROLLER, door[CONF_DOOR_NUMBER])
+
+    await doors.async_unlock_door(door[CONF_DOOR_UNIQUE_ID])
+
+    # ... wait for the listener confirmation (or the unconfirmed fallback)
+    start = time.perf_counter()
+    while key in doors._pending and time.perf_counter() - start < timeout:
+        await asyncio.sleep(0.001)
+
+
+async def poll(coordinators, stop):
+    while not stop.is_set():
+        await asyncio.gather(*[v.async_refresh() for v in coordinators])
+        await asyncio.sleep(0)
+
+
+async def run(doors, config, unlocks, interval):
+    doors._metrics = Metrics()
+
+    for i in range(unlocks):
+        await unlock(doors, config[CONF_DOORS][i % len(config[CONF_DOORS])])
+        await asyncio.sleep(interval)
+
+    return doors.metrics()
+
+
+def report(phase, snapshot):
+    print(f'{phase}')
+    print(f'  {"stage":<20} {"count":>6} {"mean":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}')
+    for stage in _STAGES:
+        if stage in snapshot:
+            v = snapshot[stage]
+            print(f'  {stage:<20} {v["count"]:>6} {v["mean"]:>8.2f} {v["p50"]:>8.2f} {v["p95"]:>8.2f} {v["p99"]:>8.2f} '
+                  f'{v["max"]:>8.2f}')
+    print()
+
+
+async def main(args):
+    config = options(args.port, args.listener)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hass = HomeAssistant(tmp)
+        hass.data[DOMAIN] = {CONF_EVENTS_BATCH: args.batch}
+
+        controller = FakeController(CONTROLLER, ('127.0.0.1', args.listener))
+        controller.serve('127.0.0.1', args.port)
+
+        Coordinators.initialise(hass, 'benchmark', config)
+
+        doors = Coordinators.doors('benchmark')
+        contexts = {
+            Coordinators.controllers('benchmark'): [CONTROLLER],
+            Coordinators.doors('benchmark'): [v[CONF_DOOR_UNIQUE_ID] for v in config[CONF_DOORS]],
+            Coordinators.cards('benchmark'): [v[CONF_CARD_NUMBER] for v in config[CONF_CARDS]],
+            Coordinators.events('benchmark'): [CONTROLLER],
+        }
+        polled = list(contexts.keys())
+
+        # ... stand-ins for the entities (the coordinators only fetch and publish for subscribed contexts)
+        unsubscribe = []
+        for coordinator, v in contexts.items():
+            for context in v:
+                unsubscribe.append(coordinator.async_add_listener(lambda: None, context))
+
+        try:
+            for v in polled:
+                await v.async_refresh()
+
+            results = {}
+            results['idle'] = await run(doors, config, args.unlocks, args.interval)
+
+            stop = asyncio.Event()
+            load = asyncio.create_task(poll(polled, stop))
+            try:
+                results['polling'] = await run(doors, config, args.unlocks, args.interval)
+            finally:
+                stop.set()
+                await load
+
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                report(f'idle ({args.unlocks} unlocks, ms)', results['idle'])
+                report(f'full polling load ({args.unlocks} unlocks, ms)', results['polling'])
+                print(f'fake controller requests: {dict(sorted(controller.requests.items()))}')
+
+        finally:
+            for f in unsubscribe:
+                f()
+
+            await Coordinators.async_unload(hass, 'benchmark')
+            controller.shutdown()
+            await hass.async_stop(force=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='door unlock latency benchmark')
+    parser.add_argument('--unlocks', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.02, help='delay between unlocks (seconds)')
+    parser.add_argument('--batch', type=int, default=25, help='event batch window (milliseconds)')
+    parser.add_argument('--port', type=int, default=60100, help='fake controller UDP port')
+    parser.add_argument('--listener', type=int, default=60101, help='event listener UDP port')
+    parser.add_argument('--json', action='store_true')
+
+    asyncio.run(main(parser.parse_args()))
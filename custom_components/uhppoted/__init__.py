@@ -20,6 +20,16 @@ from .const import CONF_POLL_CONTROLLERS
 from .const import CONF_POLL_DOORS
 from .const import CONF_POLL_CARDS
 from .const import CONF_POLL_EVENTS
+from .const import CONF_POLL_DOOR_CONTROL
+from .const import CONF_EVENTS_BUDGET
+from .const import CONF_EVENTS_WINDOW
+from .const import CONF_EVENTS_RETENTION
+from .const import CONF_EVENTS_JOURNAL_SIZE
+from .const import CONF_EVENTS_BATCH
+from .const import CONF_EVENTS_VERIFY
+from .const import CONF_EVENTS_QUEUE_SIZE
+from .const import CONF_EVENTS_RATE_LIMIT
+from .const import CONF_EVENTS_OVERLOAD
 from .const import CONF_CONTROLLERS
 
 from .const import DEFAULT_TIMEOUT
@@ -27,6 +37,16 @@ from .const import DEFAULT_POLL_CONTROLLERS
 from .const import DEFAULT_POLL_DOORS
 from .const import DEFAULT_POLL_CARDS
 from .const import DEFAULT_POLL_EVENTS
+from .const import DEFAULT_POLL_DOOR_CONTROL
+from .const import DEFAULT_EVENTS_BUDGET
+from .const import DEFAULT_EVENTS_WINDOW
+from .const import DEFAULT_EVENTS_RETENTION
+from .const import DEFAULT_EVENTS_JOURNAL_SIZE
+from .const import DEFAULT_EVENTS_BATCH
+from .const import DEFAULT_EVENTS_VERIFY
+from .const import DEFAULT_EVENTS_QUEUE_SIZE
+from .const import DEFAULT_EVENTS_RATE_LIMIT
+from .const import DEFAULT_EVENTS_OVERLOAD
 from .const import DEFAULT_MAX_CARDS
 from .const import DEFAULT_PREFERRED_CARDS
 
@@ -59,9 +79,19 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         CONF_PREFERRED_CARDS: DEFAULT_PREFERRED_CARDS,
         CONF_PIN_ENABLED: False,
         CONF_POLL_CONTROLLERS: DEFAULT_POLL_CONTROLLERS,  # 30s
-        CONF_POLL_DOORS: DEFAULT_POLL_DOORS,  # 30s
+        CONF_POLL_DOORS: DEFAULT_POLL_DOORS,  # 300s
         CONF_POLL_CARDS: DEFAULT_POLL_CARDS,  # 30s
         CONF_POLL_EVENTS: DEFAULT_POLL_EVENTS,  # 30s
+        CONF_POLL_DOOR_CONTROL: DEFAULT_POLL_DOOR_CONTROL,  # 300s
+        CONF_EVENTS_BUDGET: DEFAULT_EVENTS_BUDGET,  # 64
+        CONF_EVENTS_WINDOW: DEFAULT_EVENTS_WINDOW,  # 4
+        CONF_EVENTS_RETENTION: DEFAULT_EVENTS_RETENTION,  # 365 days
+        CONF_EVENTS_JOURNAL_SIZE: DEFAULT_EVENTS_JOURNAL_SIZE,  # 1000000
+        CONF_EVENTS_BATCH: DEFAULT_EVENTS_BATCH,  # 25ms
+        CONF_EVENTS_VERIFY: DEFAULT_EVENTS_VERIFY,  # 3600s
+        CONF_EVENTS_QUEUE_SIZE: DEFAULT_EVENTS_QUEUE_SIZE,  # 256
+        CONF_EVENTS_RATE_LIMIT: DEFAULT_EVENTS_RATE_LIMIT,  # unlimited
+        CONF_EVENTS_OVERLOAD: DEFAULT_EVENTS_OVERLOAD,  # drop-oldest
         CONF_CONTROLLERS: [],
     }
 
@@ -70,7 +100,9 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         topics = [
             CONF_BIND_ADDR, CONF_BROADCAST_ADDR, CONF_LISTEN_ADDR, CONF_DEBUG, CONF_TIMEZONE, CONF_TIMEOUT,
             CONF_MAX_CARDS, CONF_PREFERRED_CARDS, CONF_PIN_ENABLED, CONF_POLL_CONTROLLERS, CONF_POLL_DOORS,
-            CONF_POLL_CARDS, CONF_POLL_EVENTS, CONF_CONTROLLERS
+            CONF_POLL_CARDS, CONF_POLL_EVENTS, CONF_POLL_DOOR_CONTROL, CONF_EVENTS_BUDGET, CONF_EVENTS_WINDOW,
+            CONF_EVENTS_RETENTION, CONF_EVENTS_JOURNAL_SIZE, CONF_EVENTS_BATCH, CONF_EVENTS_VERIFY,
+            CONF_EVENTS_QUEUE_SIZE, CONF_EVENTS_RATE_LIMIT, CONF_EVENTS_OVERLOAD, CONF_CONTROLLERS
         ]
 
         for v in topics:
@@ -90,6 +122,16 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     _LOGGER.info(f'poll interval - doors:       {defaults[CONF_POLL_DOORS]}s')
     _LOGGER.info(f'poll interval - cards:       {defaults[CONF_POLL_CARDS]}s')
     _LOGGER.info(f'poll interval - events:      {defaults[CONF_POLL_EVENTS]}s')
+    _LOGGER.info(f'poll interval - door control:{defaults[CONF_POLL_DOOR_CONTROL]}s')
+    _LOGGER.info(f'events per poll:             {defaults[CONF_EVENTS_BUDGET]}')
+    _LOGGER.info(f'events fetch window:         {defaults[CONF_EVENTS_WINDOW]}')
+    _LOGGER.info(f'events retention:            {defaults[CONF_EVENTS_RETENTION]} days')
+    _LOGGER.info(f'events journal size:         {defaults[CONF_EVENTS_JOURNAL_SIZE]}')
+    _LOGGER.info(f'events batch window:         {defaults[CONF_EVENTS_BATCH]}ms')
+    _LOGGER.info(f'events verify interval:      {defaults[CONF_EVENTS_VERIFY]}s')
+    _LOGGER.info(f'events queue size:           {defaults[CONF_EVENTS_QUEUE_SIZE]}')
+    _LOGGER.info(f'events rate limit:           {defaults[CONF_EVENTS_RATE_LIMIT]}/s')
+    _LOGGER.info(f'events overload policy:      {defaults[CONF_EVENTS_OVERLOAD]}')
     _LOGGER.info(f'controllers:                 {defaults[CONF_CONTROLLERS]}')
 
     hass.data.setdefault(DOMAIN, defaults)
@@ -127,10 +169,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     # ... post-unload: shut down data-coordinators
-    Coordinators.unload(entry.entry_id)
+    await Coordinators.async_unload(hass, entry.entry_id)
 
     return ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # ... delete the event journal and event index checkpoint
+    await Coordinators.async_remove(hass, entry.entry_id)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
     await hass.config_entries.async_reload(entry.entry_id)
@@ -1,8 +1,6 @@
 from __future__ import annotations
-from collections import deque
 
 from datetime import datetime
-from datetime import date
 import re
 import logging
 
@@ -23,7 +21,7 @@ from .const import ATTR_CARD_STARTDATE
 from .const import ATTR_CARD_ENDDATE
 from .const import ATTR_CARD_PERMISSIONS
 from .const import ATTR_CARD_PIN
-from .const import ATTR_EVENTS
+from .const import ATTR_CARD_VALIDITY
 
 from .const import CONF_DOOR_ID
 from .const import CONF_DOOR_NUMBER
@@ -55,6 +53,7 @@ class CardInfo(CoordinatorEntity, SensorEntity):
         self._start_date = None
         self._end_date = None
         self._permissions = None
+        self._validity = None
         self._available = False
 
     @property
@@ -72,18 +71,13 @@ class CardInfo(CoordinatorEntity, SensorEntity):
     @property
     def state(self) -> Optional[str]:
         if self._available:
-            today = date.today()
             state = []
 
             if self._cardholder.strip() != '':
                 state.append(self._cardholder)
 
-            if self._start_date and self._start_date <= today and self._end_date and self._end_date >= today:
-                state.append('VALID')
-            elif self._start_date and self._start_date > today:
-                state.append('NOT VALID')
-            elif self._end_date and self._end_date < today:
-                state.append('EXPIRED')
+            if self._validity:
+                state.append(self._validity)
 
             if self._permissions and len(self._permissions) < 1:
                 state.append('NO ACCESS')
@@ -122,6 +116,7 @@ class CardInfo(CoordinatorEntity, SensorEntity):
                 self._start_date = state[ATTR_CARD_STARTDATE]
                 self._end_date = state[ATTR_CARD_ENDDATE]
                 self._permissions = state[ATTR_CARD_PERMISSIONS]
+                self._validity = state.get(ATTR_CARD_VALIDITY, None)
                 self._available = state[ATTR_AVAILABLE]
 
         except (Exception):
@@ -196,7 +191,6 @@ class CardStartDate(CoordinatorEntity, DateEntity):
         self._name = f'uhppoted.card.{card}.start-date'.lower()
         self._date = None
         self._available = False
-        self._attributes: Dict[str, Any] = {}
 
     @property
     def unique_id(self) -> str:
@@ -269,7 +263,6 @@ class CardEndDate(CoordinatorEntity, DateEntity):
         self._name = f'uhppoted.card.{card}.end-date'.lower()
         self._date = None
         self._available = False
-        self._attributes: Dict[str, Any] = {}
 
     @property
     def unique_id(self) -> str:
@@ -342,9 +335,10 @@ class CardPermission(CoordinatorEntity, SwitchEntity):
         self.door = door
         self._unique_id = unique_id
         self._name = f'uhppoted.card.{card}.{door[CONF_DOOR_ID]}'.lower()
+        self._serial_no = int(f'{door[CONF_CONTROLLER_SERIAL_NUMBER]}')
+        self._door_no = int(f'{door[CONF_DOOR_NUMBER]}')
         self._allowed = None
         self._available = False
-        self._attributes: Dict[str, Any] = {}
 
     @property
     def unique_id(self) -> str:
@@ -411,7 +405,6 @@ class CardPermission(CoordinatorEntity, SwitchEntity):
         _LOGGER.debug(f'card:{self.card} update door {self.door[CONF_DOOR_ID]} access')
         try:
             idx = self.card
-            door = self.door[CONF_DOOR_ID]
 
             if not self.coordinator.data or idx not in self.coordinator.data:
                 self._available = False
@@ -419,12 +412,10 @@ class CardPermission(CoordinatorEntity, SwitchEntity):
                 self._available = False
             elif ATTR_CARD_PERMISSIONS not in self.coordinator.data[idx]:
                 self._available = False
-            elif self.coordinator.data[idx][ATTR_CARD_PERMISSIONS] == None:
-                self._allowed = False
-                self._available = self.coordinator.data[idx][ATTR_AVAILABLE]
             else:
-                self._allowed = door in self.coordinator.data[idx][ATTR_CARD_PERMISSIONS]
-                self._available = self.coordinator.data[idx][ATTR_AVAILABLE]
+                state = self.coordinator.data[idx]
+                self._allowed = state.allowed(self._serial_no, self._door_no)
+                self._available = state[ATTR_AVAILABLE]
         except (Exception):
             self._available = False
             _LOGGER.exception(f'error updating card {self.card} access for door {self.door}')
@@ -450,7 +441,6 @@ class CardPIN(CoordinatorEntity, TextEntity):
         self._pin = None
         self._allowed = None
         self._available = False
-        self._attributes: Dict[str, Any] = {}
 
     @property
     def unique_id(self) -> str:
@@ -527,8 +517,8 @@ class CardSwiped(CoordinatorEntity, EventEntity):
 
         self._unique_id = unique_id
         self._name = f'uhppoted.card.{card}.swipe.event'.lower()
-        self._events = deque([], 16)
         self._available = False
+        self._cursor = 0
 
     @property
     def unique_id(self) -> str:
@@ -542,9 +532,23 @@ class CardSwiped(CoordinatorEntity, EventEntity):
     def available(self) -> bool:
         return self._available
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._cursor = self.coordinator.sequence()
+        self.async_on_remove(self.coordinator.subscribe(self._on_events, card=self.card))
+
+    @callback
+    def _on_events(self):
+        for (seq, e) in self.coordinator.events(self._cursor, card=self.card):
+            self._cursor = seq
+            if e.reason in CARD_EVENTS:
+                self._trigger_event(CARD_EVENTS[e.reason])
+                self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self._update()
+        self._on_events()
         self.async_write_ha_state()
 
     async def async_update(self):
@@ -554,22 +558,6 @@ class CardSwiped(CoordinatorEntity, EventEntity):
         _LOGGER.debug(f'card:{self.card} swipe event')
         try:
             if self.coordinator.data:
-                for idx in self.coordinator.data:
-                    if ATTR_EVENTS not in self.coordinator.data[idx]:
-                        pass
-                    elif not self.coordinator.data[idx][ATTR_AVAILABLE]:
-                        pass
-                    else:
-                        events = self.coordinator.data[idx][ATTR_EVENTS]
-                        for e in events:
-                            if e.card == self.card and e.reason in CARD_EVENTS:
-                                self._events.appendleft(CARD_EVENTS[e.reason])
-
-                # ... because Home Assistant coalesces multiple events in an update cycle
-                if len(self._events) > 0:
-                    event = self._events.pop()
-                    self._trigger_event(event)
-
                 self._available = True
 
         except (Exception):
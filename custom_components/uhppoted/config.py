@@ -1,5 +1,7 @@
 import re
 import logging
+import threading
+import concurrent.futures
 import datetime
 import calendar
 import socket
@@ -58,6 +60,8 @@ from .uhppoted import uhppoted
 from .uhppoted import Controller
 
 _LOGGER = logging.getLogger(__name__)
+_CARD_SCAN_WORKERS = 10
+_CARD_SCAN_WINDOW = 4
 
 
 def normalise(v):
@@ -203,7 +207,7 @@ def get_IPv4_addresses():
     return addresses
 
 
-def get_all_controllers(predefined, options):
+def get_all_controllers(predefined, options, discovered=None):
     controllers = dict()
 
     for v in predefined:
@@ -236,21 +240,24 @@ def get_all_controllers(predefined, options):
             }
 
     try:
-        bind = options[CONF_BIND_ADDR]
-        broadcast = options[CONF_BROADCAST_ADDR]
-        listen = options[CONF_LISTEN_ADDR]
-        debug = options[CONF_DEBUG]
+        if discovered is None:
+            bind = options[CONF_BIND_ADDR]
+            broadcast = options[CONF_BROADCAST_ADDR]
+            listen = options[CONF_LISTEN_ADDR]
+            debug = options[CONF_DEBUG]
 
-        response = uhppoted.get_all_controllers(bind, broadcast, listen, debug)
+            response = uhppoted.get_all_controllers(bind, broadcast, listen, debug)
+            discovered = [{'controller': v.controller, 'address': f'{v.ip_address}'} for v in response]
 
-        for v in response:
+        for v in discovered:
+            serial_no = v['controller']
             protocol = 'UDP'
-            if v.controller in controllers:
-                protocol = controllers[v.controller].get('protocol', protocol)
+            if serial_no in controllers:
+                protocol = controllers[serial_no].get('protocol', protocol)
 
-            controllers[v.controller] = {
-                'controller': v.controller,
-                'address': f'{v.ip_address}',
+            controllers[serial_no] = {
+                'controller': serial_no,
+                'address': v['address'],
                 'port': 60000,
                 'protocol': protocol,
             }
@@ -309,10 +316,22 @@ def get_all_doors(options):
     return sorted(list(controllers), key=lambda v: v[CONF_CONTROLLER_SERIAL_NUMBER], reverse=True)
 
 
-def get_all_cards(options, max_cards=DEFAULT_MAX_CARDS, preferred_cards=DEFAULT_PREFERRED_CARDS):
-    cards = dict()
+def get_all_cards(options, max_cards=DEFAULT_MAX_CARDS, preferred_cards=DEFAULT_PREFERRED_CARDS, cache=None):
+    lock = threading.Lock()
     u = configure_driver(options)
 
+    # ... cached scan state (lives as long as the config/options flow and allows an interrupted scan to be resumed)
+    if cache is None:
+        cache = {}
+
+    scan = cache.setdefault('cards', {
+        'cards': dict(),
+        'preferred': set(),
+        'controllers': dict(),
+    })
+
+    cards = scan['cards']
+
     # ... build 'preferred' cards list
     preferred = set()
     if preferred_cards:
@@ -322,56 +341,98 @@ def get_all_cards(options, max_cards=DEFAULT_MAX_CARDS, preferred_cards=DEFAULT_
             preferred = {int(v) for v in re.findall(r'[0-9]+', f'{preferred_cards}')}
 
     # ... get preferred cards
-    for controller in u.controllers:
-        for card in sorted(list(preferred)):
-            try:
-                response = u.get_card(controller, card)
+    def get_preferred_card(controller, card):
+        try:
+            response = u.get_card(controller, card)
+            with lock:
                 if response.card_number == card:
                     cards[response.card_number] = {
                         CONF_CARD_NUMBER: response.card_number,
                         CONF_CARD_UNIQUE_ID: uuid.uuid4(),
                         CONF_CARD_NAME: None,
                     }
-            except Exception as e:
-                _LOGGER.warning(f'{controller} error retrieving preferred card {card} ({e})')
-
-    # ... get controller cards
-    for controller in u.controllers:
-        try:
-            response = u.get_cards(controller)
-            _LOGGER.info(f'{controller}: {response.cards} cards')
+                scan['preferred'].add((controller, card))
+        except Exception as e:
+            _LOGGER.warning(f'{controller} error retrieving preferred card {card} ({e})')
 
-            N = min(response.cards, max_cards)
-            ix = 1
-            count = 0
-            errors = 0
+    pending = [(c, v) for c in u.controllers for v in sorted(list(preferred)) if (c, v) not in scan['preferred']]
 
-            while count < N and ix < DEFAULT_MAX_CARD_INDEX and len(cards) < max_cards and errors < DEFAULT_MAX_CARD_ERRORS: # yapf: disable
-                try:
-                    response = u.get_card_by_index(controller, ix)
-                    cards[response.card_number] = {
-                        CONF_CARD_NUMBER: response.card_number,
-                        CONF_CARD_UNIQUE_ID: uuid.uuid4(),
-                        CONF_CARD_NAME: None,
-                    }
-                    count += 1
-                    ix += 1
-                except Exception as e:
-                    errors += 1
-                    _LOGGER.warning(f'{controller} error retrieving card at index {ix} ({e})')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=_CARD_SCAN_WORKERS) as executor:
+        executor.map(lambda v: get_preferred_card(*v), pending)
 
-        except Exception as e:
-            _LOGGER.warning(f'{controller} error retrieving list of cards ({e})')
+    # ... get controller cards
+    with concurrent.futures.ThreadPoolExecutor(max_workers=_CARD_SCAN_WORKERS) as executor:
+        executor.map(lambda controller: _scan_cards(u, controller, scan, max_cards, lock), u.controllers)
 
     # ... add cards from options
+    records = dict(cards)
     if options and CONF_CARDS in options:
         for v in options[CONF_CARDS]:
             k = int(f'{v[CONF_CARD_NUMBER]}')
-            cards[k] = v
+            records[k] = v
 
     # ... convert cards list to records
 
-    return [cards[k] for k in sorted(cards.keys())]
+    return [records[k] for k in sorted(records.keys())]
+
+
+def _scan_cards(u, controller, scan, max_cards, lock):
+    cards = scan['cards']
+
+    with lock:
+        state = scan['controllers'].setdefault(controller, {
+            'cards': None,
+            'index': 1,
+            'count': 0,
+            'done': False,
+        })
+
+    if state['done']:
+        return
+
+    try:
+        if state['cards'] is None:
+            response = u.get_cards(controller)
+            _LOGGER.info(f'{controller}: {response.cards} cards')
+            state['cards'] = response.cards
+
+        N = min(state['cards'], max_cards)
+        errors = 0
+
+        def get_card_by_index(ix):
+            try:
+                return (ix, u.get_card_by_index(controller, ix))
+            except Exception as e:
+                _LOGGER.warning(f'{controller} error retrieving card at index {ix} ({e})')
+                return (ix, None)
+
+        # ... pipelined index reads, resuming from the first index that failed
+        with concurrent.futures.ThreadPoolExecutor(max_workers=_CARD_SCAN_WINDOW) as executor:
+            while state['count'] < N and state['index'] < DEFAULT_MAX_CARD_INDEX and len(cards) < max_cards and errors < DEFAULT_MAX_CARD_ERRORS: # yapf: disable
+                ix = state['index']
+                window = min(_CARD_SCAN_WINDOW, N - state['count'], DEFAULT_MAX_CARD_INDEX - ix)
+
+                for (ix, response) in executor.map(get_card_by_index, range(ix, ix + window)):
+                    if response is None:
+                        errors += 1
+                        break
+
+                    with lock:
+                        if len(cards) < max_cards:
+                            cards[response.card_number] = {
+                                CONF_CARD_NUMBER: response.card_number,
+                                CONF_CARD_UNIQUE_ID: uuid.uuid4(),
+                                CONF_CARD_NAME: None,
+                            }
+
+                    state['count'] += 1
+                    state['index'] = ix + 1
+
+        if state['count'] >= N or state['index'] >= DEFAULT_MAX_CARD_INDEX:
+            state['done'] = True
+
+    except Exception as e:
+        _LOGGER.warning(f'{controller} error retrieving list of cards ({e})')
 
 
 def get_card(card_number, options):
@@ -567,3 +628,49 @@ def resolve_door_by_name(options, name):
                         }
 
     return None
+
+
+class Topology:
+
+    def __init__(self, options):
+        self._doors = {}
+        self._controllers = {}
+        self._names = {}
+
+        if CONF_CONTROLLERS in options and CONF_DOORS in options:
+            controllers = {}
+            for v in options[CONF_CONTROLLERS]:
+                controllers[v[CONF_CONTROLLER_ID]] = int(f'{v[CONF_CONTROLLER_SERIAL_NUMBER]}')
+
+            for v in options[CONF_DOORS]:
+                if v[CONF_DOOR_CONTROLLER] in controllers:
+                    unique_id = v[CONF_DOOR_UNIQUE_ID]
+                    serial_no = controllers[v[CONF_DOOR_CONTROLLER]]
+                    door = {
+                        CONF_DOOR_ID: v[CONF_DOOR_ID],
+                        CONF_CONTROLLER_SERIAL_NUMBER: serial_no,
+                        CONF_DOOR_NUMBER: int(f'{v[CONF_DOOR_NUMBER]}'),
+                    }
+
+                    self._doors[unique_id] = door
+                    self._controllers.setdefault(serial_no, []).append(unique_id)
+                    self._names.setdefault(_normalise_door_name(v[CONF_DOOR_ID]), unique_id)
+
+    def door(self, unique_id):
+        return self._doors.get(unique_id, None)
+
+    def door_by_name(self, name):
+        return self._doors.get(self.unique_id(name), None)
+
+    def unique_id(self, name):
+        return self._names.get(_normalise_door_name(name), None)
+
+    def doors(self, controller):
+        return self._controllers.get(controller, [])
+
+    def all_doors(self):
+        return list(self._doors.keys())
+
+
+def _normalise_door_name(v):
+    return re.sub('[^a-zA-z0-9]', '', f'{v}'.strip().lower())
@@ -203,7 +203,7 @@ class UhppotedConfigFlow(UhppotedFlow, ConfigFlow, domain=DOMAIN):
         return self.async_show_form(step_id="events", data_schema=schema, errors=errors)
 
     async def async_step_controllers(self, user_input: Optional[Dict[str, Any]] = None):
-        controllers = self._get_all_controllers(self.options)
+        controllers = await self._get_all_controllers(self.options)
 
         self.cache['controllers'] = controllers
 
@@ -391,7 +391,9 @@ class UhppotedConfigFlow(UhppotedFlow, ConfigFlow, domain=DOMAIN):
 
                 return await self.async_step_card()
 
-        cards = [v[CONF_CARD_NUMBER] for v in get_all_cards(self.options, self._max_cards, self._preferred_cards)]
+        cards = await self.hass.async_add_executor_job(get_all_cards, self.options, self._max_cards,
+                                                       self._preferred_cards, self.cache)
+        cards = [v[CONF_CARD_NUMBER] for v in cards]
 
         if len(cards) < 2:
             self.configuration['cards'] = [{
@@ -17,6 +17,16 @@ CONF_POLL_CONTROLLERS = 'controllers_poll_interval'
 CONF_POLL_DOORS = 'doors_poll_interval'
 CONF_POLL_CARDS = 'cards_poll_interval'
 CONF_POLL_EVENTS = 'events_poll_interval'
+CONF_POLL_DOOR_CONTROL = 'door_control_poll_interval'
+CONF_EVENTS_BUDGET = 'events_per_poll'
+CONF_EVENTS_WINDOW = 'events_fetch_window'
+CONF_EVENTS_RETENTION = 'events_retention'
+CONF_EVENTS_JOURNAL_SIZE = 'events_journal_size'
+CONF_EVENTS_BATCH = 'events_batch_window'
+CONF_EVENTS_VERIFY = 'events_verify_interval'
+CONF_EVENTS_QUEUE_SIZE = 'events_queue_size'
+CONF_EVENTS_RATE_LIMIT = 'events_rate_limit'
+CONF_EVENTS_OVERLOAD = 'events_overload_policy'
 
 CONF_CONTROLLERS = 'controllers'
 CONF_CONTROLLER_UNIQUE_ID = 'controller_unique_id'
@@ -71,9 +81,11 @@ ATTR_CARD_STARTDATE = 'start_date'
 ATTR_CARD_ENDDATE = 'end_date'
 ATTR_CARD_PERMISSIONS = 'permissions'
 ATTR_CARD_PIN = 'PIN'
+ATTR_CARD_VALIDITY = 'validity'
 
 ATTR_EVENTS = 'events'
 ATTR_STATUS = 'status'
+ATTR_EVENTS_BACKLOG = 'backlog'
 
 DEFAULT_BIND_ADDRESS = '0.0.0.0'
 DEFAULT_BROADCAST_ADDRESS = '255.255.255.255:60000'
@@ -83,9 +95,19 @@ DEFAULT_TIMEOUT = 2.5  # seconds
 DEFAULT_DEBUG = False
 
 DEFAULT_POLL_CONTROLLERS = 30  # seconds
-DEFAULT_POLL_DOORS = 30  # seconds
+DEFAULT_POLL_DOORS = 300  # seconds
 DEFAULT_POLL_CARDS = 30  # seconds
 DEFAULT_POLL_EVENTS = 30  # seconds
+DEFAULT_POLL_DOOR_CONTROL = 300  # seconds
+DEFAULT_EVENTS_BUDGET = 64
+DEFAULT_EVENTS_WINDOW = 4
+DEFAULT_EVENTS_RETENTION = 365  # days
+DEFAULT_EVENTS_JOURNAL_SIZE = 1000000  # events
+DEFAULT_EVENTS_BATCH = 25  # milliseconds
+DEFAULT_EVENTS_VERIFY = 3600  # seconds
+DEFAULT_EVENTS_QUEUE_SIZE = 256  # events
+DEFAULT_EVENTS_RATE_LIMIT = 0  # events per second per controller (0 is unlimited)
+DEFAULT_EVENTS_OVERLOAD = 'drop-oldest'
 
 DEFAULT_CONTROLLER_ID = ''
 DEFAULT_CONTROLLER_ADDR = ''
@@ -113,6 +135,12 @@ EVENT_REASON_DOOR_LOCKED = 256
 EVENT_REASON_DOOR_UNLOCKED = 257
 EVENT_REASON_BUTTON_RELEASED = 258
 
+EVENTS_OVERLOAD_DROP_OLDEST = 'drop-oldest'
+EVENTS_OVERLOAD_COLLAPSE = 'collapse'
+EVENTS_OVERLOAD_PAUSE = 'pause'
+
+CONTEXT_INGRESS = 'ingress'
+
 EVENTS = {
     1: 'Card swipe',
     2: 'Event #2',
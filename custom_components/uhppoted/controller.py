@@ -1,5 +1,4 @@
 from __future__ import annotations
-from collections import deque
 
 import datetime
 import logging
@@ -7,6 +6,7 @@ import logging
 _LOGGER = logging.getLogger(__name__)
 
 from homeassistant.core import callback
+from homeassistant.const import EntityCategory
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.datetime import DateTimeEntity
 from homeassistant.components.event import EventEntity
@@ -23,6 +23,7 @@ from .const import ATTR_CONTROLLER_DATETIME
 from .const import ATTR_CONTROLLER_LISTENER
 from .const import ATTR_EVENTS
 from .const import EVENTS
+from .const import CONTEXT_INGRESS
 
 
 class ControllerInfo(CoordinatorEntity, SensorEntity):
@@ -180,6 +181,81 @@ class ControllerDateTime(CoordinatorEntity, DateTimeEntity):
             _LOGGER.exception(f'error retrieving controller {self.controller} date/time')
 
 
+class ControllerEventRate(CoordinatorEntity, SensorEntity):
+    _attr_icon = 'mdi:speedometer'
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = 'events/s'
+
+    def __init__(self, coordinator, unique_id, controller, serial_no):
+        super().__init__(coordinator, context=(CONTEXT_INGRESS, int(f'{serial_no}')))
+
+        _LOGGER.debug(f'controller {controller} event rate')
+
+        self._unique_id = unique_id
+        self.controller = controller
+        self._serial_no = int(f'{serial_no}')
+        self._name = f'uhppoted.controller.{controller}.event.rate'.lower()
+        self._state = None
+        self._attributes: Dict[str, Any] = {
+            'queue_depth': None,
+            'throttled': None,
+            'dropped': None,
+            'collapsed': None,
+            'deferred': None,
+            'paused': None,
+        }
+        self._available = False
+
+    @property
+    def unique_id(self) -> str:
+        return f'uhppoted.controller.{self._unique_id}.event.rate'.lower()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    @property
+    def state(self) -> Optional[str]:
+        if self._state != None:
+            return f'{self._state}'
+
+        return None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        return self._attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update()
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        self._update()
+
+    def _update(self):
+        _LOGGER.debug(f'controller:{self.controller} update event rate')
+        try:
+            ingress = self.coordinator.ingress()
+            counters = ingress['controllers'].get(self._serial_no, {})
+
+            self._state = counters.get('rate', 0.0)
+            self._attributes['queue_depth'] = ingress['queue_depth']
+            for k in ['throttled', 'dropped', 'collapsed', 'deferred', 'paused']:
+                self._attributes[k] = counters.get(k, False if k == 'paused' else 0)
+
+            self._available = True
+
+        except (Exception):
+            self._available = False
+            _LOGGER.exception(f'error retrieving controller {self.controller} event rate')
+
+
 class ControllerEvent(CoordinatorEntity, EventEntity):
     _attr_icon = 'mdi:lock-alert'
     _attr_has_entity_name: True
@@ -194,8 +270,8 @@ class ControllerEvent(CoordinatorEntity, EventEntity):
         self.controller = controller
         self._serial_no = int(f'{serial_no}')
         self._name = f'uhppoted.controller.{controller}.event'.lower()
-        self._events = deque([], 16)
         self._available = False
+        self._cursor = 0
 
     @property
     def unique_id(self) -> str:
@@ -209,9 +285,23 @@ class ControllerEvent(CoordinatorEntity, EventEntity):
     def available(self) -> bool:
         return self._available
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._cursor = self.coordinator.sequence()
+        self.async_on_remove(self.coordinator.subscribe(self._on_events, controller=self._serial_no))
+
+    @callback
+    def _on_events(self):
+        for (seq, e) in self.coordinator.events(self._cursor, controller=self._serial_no):
+            self._cursor = seq
+            if e.reason in EVENTS:
+                self._trigger_event(EVENTS[e.reason])
+                self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self._update()
+        self._on_events()
         self.async_write_ha_state()
 
     async def async_update(self):
@@ -227,18 +317,8 @@ class ControllerEvent(CoordinatorEntity, EventEntity):
             elif ATTR_EVENTS not in self.coordinator.data[idx]:
                 self._available = False
             else:
-                events = self.coordinator.data[idx][ATTR_EVENTS]
-                for e in events:
-                    if e.reason in EVENTS:
-                        self._events.appendleft(EVENTS[e.reason])
-
                 self._available = True
 
-            # ... because Home Assistant coalesces multiple events in an update cycle
-            if len(self._events) > 0:
-                event = self._events.pop()
-                self._trigger_event(event)
-
         except (Exception):
             self._available = False
             _LOGGER.exception(f'error retrieving controller {self.controller} events')
@@ -8,6 +8,8 @@ import async_timeout
 
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
 
 from uhppoted import uhppote
 
@@ -17,21 +19,18 @@ _INTERVAL = datetime.timedelta(seconds=30)
 from ..const import CONF_CONTROLLER_SERIAL_NUMBER
 from ..const import CONF_DOOR_NUMBER
 
-from ..const import ATTR_AVAILABLE
-from ..const import ATTR_CARD_STARTDATE
-from ..const import ATTR_CARD_ENDDATE
-from ..const import ATTR_CARD_PERMISSIONS
-from ..const import ATTR_CARD_PIN
-
 from ..config import configure_cards
 from ..config import get_configured_controllers_ext
 from ..config import get_configured_controllers
 from ..config import get_configured_cards
-from ..config import resolve_permissions
 from ..config import default_card_start_date
 from ..config import default_card_end_date
 
 from ..uhppoted import Controller
+from .db import ACL
+from .db import CardRecord
+from .db import validity
+from .db import next_transition
 
 
 class CardsCoordinator(DataUpdateCoordinator):
@@ -47,6 +46,11 @@ class CardsCoordinator(DataUpdateCoordinator):
         self._uhppote = driver
         self._db = db
         self._state = {}
+        self._lock = threading.Lock()
+        self._acl = ACL(options)
+        self._transitions = {}
+        self._scheduled = {}
+        self._timer = None
         self._initialised = False
 
         _LOGGER.info(f'cards coordinator initialised ({interval.total_seconds():.0f}s)')
@@ -55,7 +59,9 @@ class CardsCoordinator(DataUpdateCoordinator):
         self.unload()
 
     def unload(self):
-        pass
+        if self._timer:
+            self._timer()
+            self._timer = None
 
     def add_card(self, card):
         controllers = self._controllers
@@ -295,22 +301,22 @@ class CardsCoordinator(DataUpdateCoordinator):
 
             for v in contexts:
                 if not v in self._state:
-                    self._state[v] = {
-                        ATTR_AVAILABLE: False,
-                    }
+                    self._state[v] = CardRecord(self._acl)
 
             async with async_timeout.timeout(2.5):
-                return await self._get_cards(contexts)
+                cards = await self._get_cards(contexts)
+                self._schedule(contexts)
+
+                return cards
         except Exception as err:
             raise UpdateFailed(f"uhppoted API error {err}")
 
     async def _get_cards(self, contexts):
-        lock = threading.Lock()
         controllers = self._controllers
 
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                executor.map(lambda card: self._get_card(controllers, lock, card), contexts, timeout=1)
+                executor.map(lambda card: self._get_card(controllers, card), contexts, timeout=1)
         except Exception as err:
             _LOGGER.error(f'error retrieving card information ({err})')
 
@@ -318,62 +324,115 @@ class CardsCoordinator(DataUpdateCoordinator):
 
         return self._db.cards
 
-    def _get_card(self, controllers, lock, card):
-        _LOGGER.debug(f'fetch card {card} information')
+    async def async_refresh_cards(self, cards, controllers=None):
+        cards = [int(f'{v}') for v in cards if int(f'{v}') in self._state]
+
+        if controllers is None:
+            controllers = self._controllers
+        else:
+            controllers = [self._resolve(int(f'{v}')) for v in controllers]
 
-        info = {
-            ATTR_AVAILABLE: False,
-            ATTR_CARD_STARTDATE: None,
-            ATTR_CARD_ENDDATE: None,
-            ATTR_CARD_PERMISSIONS: None,
-        }
+        if cards and controllers:
+            await self.hass.async_add_executor_job(self._refresh_cards, controllers, cards)
 
+            self._db.cards = self._state
+            self._schedule(cards)
+            self._notify(cards)
+
+    def _refresh_cards(self, controllers, cards):
         try:
-            start_date = None
-            end_date = None
-            permissions = {}
-            PIN = None
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                executor.map(lambda card: self._get_card(controllers, card), cards, timeout=1)
+        except Exception as err:
+            _LOGGER.error(f'error refreshing card information ({err})')
 
+    def _get_card(self, controllers, card):
+        _LOGGER.debug(f'fetch card {card} information')
+
+        try:
+            records = {}
             for controller in controllers:
                 response = self._uhppote.get_card(controller.id, card)
 
                 if response.controller == controller.id and response.card_number == card:
-                    if response.start_date and (not start_date or response.start_date < start_date):
-                        start_date = response.start_date
-
-                    if response.end_date != None and (not end_date or response.end_date > end_date):
-                        end_date = response.end_date
-
-                    permissions[controller.id] = []
+                    doors = []
 
                     if response.door_1 > 0:
-                        permissions[controller.id].append(1)
+                        doors.append(1)
 
                     if response.door_2 > 0:
-                        permissions[controller.id].append(2)
+                        doors.append(2)
 
                     if response.door_3 > 0:
-                        permissions[controller.id].append(3)
+                        doors.append(3)
 
                     if response.door_4 > 0:
-                        permissions[controller.id].append(4)
+                        doors.append(4)
+
+                    mask = self._acl.mask(controller.id, doors)
+                    records[controller.id] = (response.start_date, response.end_date, mask, response.pin)
 
-                    if response.pin > 0:
-                        PIN = response.pin
+                elif response.controller == controller.id:
+                    records[controller.id] = None
 
-            info = {
-                ATTR_CARD_STARTDATE: start_date,
-                ATTR_CARD_ENDDATE: end_date,
-                ATTR_CARD_PERMISSIONS: resolve_permissions(self._options, permissions),
-                ATTR_CARD_PIN: PIN,
-                ATTR_AVAILABLE: True,
-            }
+            # NTS: shared by the poll and the swipe refresh, which can update the same card concurrently
+            with self._lock:
+                self._state[card].update(records)
 
         except Exception as err:
             _LOGGER.error(f'error retrieving card {card} information ({err})')
 
-        with lock:
-            self._state[card].update(info)
+            with self._lock:
+                self._state[card].available = False
+
+    def _schedule(self, cards):
+        today = dt_util.now().date()
+
+        for card in cards:
+            record = self._state.get(card)
+            if record:
+                record.validity = validity(record.start_date, record.end_date, today)
+                transition = next_transition(record.start_date, record.end_date, today)
+                scheduled = self._scheduled.pop(card, None)
+
+                if scheduled and scheduled in self._transitions:
+                    self._transitions[scheduled].discard(card)
+                    if not self._transitions[scheduled]:
+                        del self._transitions[scheduled]
+
+                if transition:
+                    self._scheduled[card] = transition
+                    self._transitions.setdefault(transition, set()).add(card)
+
+        self._reschedule()
+
+    def _reschedule(self):
+        if self._timer:
+            self._timer()
+            self._timer = None
+
+        if self._transitions:
+            transition = min(self._transitions.keys())
+            self._timer = async_track_point_in_time(self.hass, self._on_transition,
+                                                    dt_util.start_of_local_day(transition))
+
+    async def _on_transition(self, now):
+        self._timer = None
+        today = dt_util.now().date()
+        cards = set()
+
+        for transition in [v for v in self._transitions.keys() if v <= today]:
+            cards.update(self._transitions.pop(transition))
+
+        _LOGGER.debug(f'card validity transition for {len(cards)} cards')
+
+        self._schedule(cards)
+        self._notify(cards)
+
+    def _notify(self, contexts):
+        for update_callback, context in list(self._listeners.values()):
+            if context in contexts:
+                update_callback()
 
     def _resolve(self, controller_id):
         for controller in self._controllers:
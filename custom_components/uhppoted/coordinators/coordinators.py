@@ -1,11 +1,25 @@
 import asyncio
 import datetime
+import logging
+
+from homeassistant.helpers.storage import Store
 
 from ..const import DOMAIN
 from ..const import CONF_POLL_CONTROLLERS
 from ..const import CONF_POLL_DOORS
 from ..const import CONF_POLL_CARDS
 from ..const import CONF_POLL_EVENTS
+from ..const import CONF_POLL_DOOR_CONTROL
+from ..const import CONF_EVENTS_BUDGET
+from ..const import CONF_EVENTS_WINDOW
+from ..const import CONF_EVENTS_RETENTION
+from ..const import CONF_EVENTS_JOURNAL_SIZE
+from ..const import CONF_EVENTS_BATCH
+from ..const import CONF_EVENTS_VERIFY
+from ..const import CONF_EVENTS_QUEUE_SIZE
+from ..const import CONF_EVENTS_RATE_LIMIT
+from ..const import CONF_EVENTS_OVERLOAD
+from ..const import CARD_EVENTS
 
 from ..config import configure_driver
 
@@ -14,6 +28,10 @@ from .doors import DoorsCoordinator
 from .cards import CardsCoordinator
 from .events import EventsCoordinator
 from .db import DB
+from .status import Status
+from .journal import Journal
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class Coordinators():
@@ -21,13 +39,19 @@ class Coordinators():
 
     @classmethod
     def initialise(clazz, hass, id, options):
-        Coordinators.COORDINATORS[id] = Coordinators(hass, options)
+        Coordinators.COORDINATORS[id] = Coordinators(hass, id, options)
 
     @classmethod
-    def unload(clazz, id):
+    async def async_unload(clazz, hass, id):
         coordinators = Coordinators.COORDINATORS.pop(id, None)
         if coordinators:
             coordinators._unload()
+            await hass.async_add_executor_job(coordinators._close)
+
+    @classmethod
+    async def async_remove(clazz, hass, id):
+        await Store(hass, 1, f'{DOMAIN}.{id}.events').async_remove()
+        await hass.async_add_executor_job(Journal.delete, hass.config.path(f'{DOMAIN}.{id}.events.db'))
 
     @classmethod
     def controllers(clazz, id):
@@ -72,6 +96,28 @@ class Coordinators():
 
         return unlocked
 
+    @classmethod
+    def set_doors(clazz, doors=None, controllers=None, all=False, mode=None, delay=None):
+        results = {}
+
+        for coordinators in Coordinators.COORDINATORS.values():
+            if coordinators and coordinators._doors:
+                results.update(coordinators._doors.set_doors(doors, controllers, all, mode, delay))
+
+        return results
+
+    @classmethod
+    def query_events(clazz, controller=None, door=None, card=None, start=None, end=None, limit=100):
+        events = []
+
+        for coordinators in Coordinators.COORDINATORS.values():
+            if coordinators and coordinators._events:
+                events.extend(coordinators._events.query(controller, door, card, start, end, limit))
+
+        events.sort(key=lambda v: (v['timestamp'] or '', v['index']), reverse=True)
+
+        return events[:limit]
+
     @classmethod
     def add_card(clazz, card):
         added = False
@@ -93,11 +139,21 @@ class Coordinators():
                     deleted = True
         return deleted
 
-    def __init__(self, hass, options):
+    def __init__(self, hass, id, options):
         poll_controllers = None
         poll_doors = None
         poll_cards = None
         poll_events = None
+        poll_door_control = None
+        events_budget = None
+        events_window = None
+        retention = None
+        journal_size = None
+        events_batch = None
+        events_verify = None
+        events_queue = None
+        events_rate = None
+        events_policy = None
 
         listen_addr = '0.0.0.0:60001'
 
@@ -115,13 +171,50 @@ class Coordinators():
         if CONF_POLL_EVENTS in defaults:
             poll_events = datetime.timedelta(seconds=defaults[CONF_POLL_EVENTS])
 
+        if CONF_POLL_DOOR_CONTROL in defaults:
+            poll_door_control = datetime.timedelta(seconds=defaults[CONF_POLL_DOOR_CONTROL])
+
+        if CONF_EVENTS_BUDGET in defaults:
+            events_budget = int(f'{defaults[CONF_EVENTS_BUDGET]}')
+
+        if CONF_EVENTS_WINDOW in defaults:
+            events_window = int(f'{defaults[CONF_EVENTS_WINDOW]}')
+
+        if CONF_EVENTS_RETENTION in defaults:
+            retention = datetime.timedelta(days=defaults[CONF_EVENTS_RETENTION])
+
+        if CONF_EVENTS_JOURNAL_SIZE in defaults:
+            journal_size = int(f'{defaults[CONF_EVENTS_JOURNAL_SIZE]}')
+
+        if CONF_EVENTS_BATCH in defaults:
+            events_batch = datetime.timedelta(milliseconds=defaults[CONF_EVENTS_BATCH])
+
+        if CONF_EVENTS_VERIFY in defaults:
+            events_verify = datetime.timedelta(seconds=defaults[CONF_EVENTS_VERIFY])
+
+        if CONF_EVENTS_QUEUE_SIZE in defaults:
+            events_queue = int(f'{defaults[CONF_EVENTS_QUEUE_SIZE]}')
+
+        if CONF_EVENTS_RATE_LIMIT in defaults:
+            events_rate = float(f'{defaults[CONF_EVENTS_RATE_LIMIT]}')
+
+        if CONF_EVENTS_OVERLOAD in defaults:
+            events_policy = f'{defaults[CONF_EVENTS_OVERLOAD]}'.lower()
+
         self._db = DB()
         self._driver = configure_driver(options, defaults)
+        self._status = Status(self._driver)
+        self._journal = Journal(hass.config.path(f'{DOMAIN}.{id}.events.db'), retention, journal_size)
         self._controllers = ControllersCoordinator(hass, options, poll_controllers, self._driver, self._db)
-        self._doors = DoorsCoordinator(hass, options, poll_doors, self._driver, self._db)
+        self._doors = DoorsCoordinator(hass, options, poll_doors, poll_door_control, self._driver, self._db,
+                                       self._status)
         self._cards = CardsCoordinator(hass, options, poll_cards, self._driver, self._db)
-        self._events = EventsCoordinator(hass, options, poll_events, self._driver, self._db,
-                                         lambda evt: self._on_event(hass, evt))
+        store = Store(hass, 1, f'{DOMAIN}.{id}.events')
+
+        self._events = EventsCoordinator(hass, options, poll_events, events_budget, events_window, self._driver,
+                                         self._db, self._status, store, self._journal, events_batch, events_verify,
+                                         events_queue, events_rate, events_policy,
+                                         lambda events: self._on_event(hass, events))
 
     def __del__(self):
         self._unload()
@@ -132,8 +225,25 @@ class Coordinators():
         self._cards.unload()
         self._events.unload()
 
-    def _on_event(self, hass, event):
-        asyncio.run_coroutine_threadsafe(self._async_on_event(event), hass.loop)
+    def _close(self):
+        try:
+            self._journal.flush()
+            self._journal.close()
+        except Exception as err:
+            _LOGGER.warning(f'error closing event journal ({err})')
+
+    def _on_event(self, hass, events):
+        asyncio.run_coroutine_threadsafe(self._async_on_event(events), hass.loop)
+
+    async def _async_on_event(self, events):
+        self._doors.on_events(events)
+
+        cards = set()
+        controllers = set()
+        for (event, _) in events:
+            if event.card and event.reason in CARD_EVENTS:
+                cards.add(event.card)
+                controllers.add(event.controller)
 
-    async def _async_on_event(self, event):
-        await self._doors.async_request_refresh()
+        if cards:
+            await self._cards.async_refresh_cards(sorted(cards), sorted(controllers))
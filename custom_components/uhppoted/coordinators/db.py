@@ -1,7 +1,27 @@
+import datetime
 import threading
 
 from typing import Dict
 
+# NTS: interned per-controller card entries are shared between records - the cache is simply reset if
+#      it grows past the limit (existing records keep their entries but new records are no longer shared)
+_INTERN_LIMIT = 65536
+
+from ..const import CONF_CONTROLLERS
+from ..const import CONF_CONTROLLER_ID
+from ..const import CONF_CONTROLLER_SERIAL_NUMBER
+from ..const import CONF_DOORS
+from ..const import CONF_DOOR_ID
+from ..const import CONF_DOOR_CONTROLLER
+from ..const import CONF_DOOR_NUMBER
+
+from ..const import ATTR_AVAILABLE
+from ..const import ATTR_CARD_STARTDATE
+from ..const import ATTR_CARD_ENDDATE
+from ..const import ATTR_CARD_PERMISSIONS
+from ..const import ATTR_CARD_PIN
+from ..const import ATTR_CARD_VALIDITY
+
 
 class DB:
     _lock: threading.Lock
@@ -53,3 +73,176 @@ class DB:
     def events(self, events):
         with self._lock:
             self._events = events
+
+
+# NTS: card permissions are a bitmask with 4 bits (one per door) for each controller, in
+#      controller configuration order.
+class ACL:
+    __slots__ = ('_controllers', '_doors', '_interned')
+
+    def __init__(self, options):
+        self._controllers = {}
+        self._doors = []
+        self._interned = {}
+
+        controllers = options.get(CONF_CONTROLLERS, [])
+        doors = options.get(CONF_DOORS, [])
+
+        for ix, u in enumerate(controllers):
+            serial_no = int(f'{u[CONF_CONTROLLER_SERIAL_NUMBER]}')
+            self._controllers[serial_no] = ix
+
+            for d in doors:
+                door_no = int(f'{d[CONF_DOOR_NUMBER]}')
+                if d[CONF_DOOR_CONTROLLER] == u[CONF_CONTROLLER_ID] and door_no in [1, 2, 3, 4]:
+                    self._doors.append((d[CONF_DOOR_ID], 1 << (4 * ix + door_no - 1)))
+
+    def __len__(self):
+        return len(self._controllers)
+
+    def index(self, controller):
+        return self._controllers.get(controller)
+
+    def bits(self, ix):
+        return 0x0f << (4 * ix)
+
+    def intern(self, v):
+        interned = self._interned.get(v)
+        if interned is None:
+            if len(self._interned) >= _INTERN_LIMIT:
+                self._interned.clear()
+
+            interned = self._interned.setdefault(v, v)
+
+        return interned
+
+    def mask(self, controller, doors):
+        ix = self._controllers.get(controller)
+        mask = 0
+
+        if ix is not None:
+            for door in doors:
+                mask |= 1 << (4 * ix + door - 1)
+
+        return mask
+
+    def resolve(self, mask):
+        return sorted({name for (name, bit) in self._doors if mask & bit})
+
+    def allowed(self, mask, controller, door):
+        ix = self._controllers.get(controller)
+        if ix is not None:
+            return mask & (1 << (4 * ix + door - 1)) != 0
+
+        return False
+
+
+# NTS: 'records' retains the per-controller (start date, end date, PIN) so that a card can be refreshed
+#      from a subset of the controllers. The entries (and the tuple of entries) are interned because most
+#      cards share a handful of date ranges, and the permissions are kept only as the aggregate bitmask
+#      since each controller has its own 4 bits.
+class CardRecord:
+    __slots__ = ('_acl', 'available', 'start_date', 'end_date', 'permissions', 'PIN', 'validity', 'records')
+
+    def __init__(self, acl):
+        self._acl = acl
+        self.available = False
+        self.start_date = None
+        self.end_date = None
+        self.permissions = None
+        self.PIN = None
+        self.validity = None
+        self.records = None
+
+    def __contains__(self, key):
+        return key in _CARD_RECORD_KEYS
+
+    def __getitem__(self, key):
+        if key == ATTR_CARD_PERMISSIONS:
+            return None if self.permissions is None else self._acl.resolve(self.permissions)
+        elif key in _CARD_RECORD_KEYS:
+            return getattr(self, _CARD_RECORD_KEYS[key])
+
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def allowed(self, controller, door):
+        if self.permissions is None:
+            return False
+
+        return self._acl.allowed(self.permissions, controller, door)
+
+    def update(self, records):
+        acl = self._acl
+        updated = list(self.records) if self.records is not None else [None] * len(acl)
+        permissions = self.permissions or 0
+
+        for controller, record in records.items():
+            ix = acl.index(controller)
+            if ix is not None:
+                permissions &= ~acl.bits(ix)
+                if record:
+                    (start, end, mask, pin) = record
+                    updated[ix] = acl.intern((start, end, pin))
+                    permissions |= mask
+                else:
+                    updated[ix] = None
+
+        self.records = acl.intern(tuple(updated))
+
+        start_date = None
+        end_date = None
+        PIN = None
+
+        for v in self.records:
+            if v:
+                (start, end, pin) = v
+                if start and (not start_date or start < start_date):
+                    start_date = start
+
+                if end != None and (not end_date or end > end_date):
+                    end_date = end
+
+                if pin > 0:
+                    PIN = pin
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.permissions = permissions
+        self.PIN = PIN
+        self.available = True
+
+
+_CARD_RECORD_KEYS = {
+    ATTR_AVAILABLE: 'available',
+    ATTR_CARD_STARTDATE: 'start_date',
+    ATTR_CARD_ENDDATE: 'end_date',
+    ATTR_CARD_PERMISSIONS: 'permissions',
+    ATTR_CARD_PIN: 'PIN',
+    ATTR_CARD_VALIDITY: 'validity',
+}
+
+
+def validity(start_date, end_date, today):
+    if start_date and start_date <= today and end_date and end_date >= today:
+        return 'VALID'
+    elif start_date and start_date > today:
+        return 'NOT VALID'
+    elif end_date and end_date < today:
+        return 'EXPIRED'
+
+    return None
+
+
+def next_transition(start_date, end_date, today):
+    if start_date and start_date > today:
+        return start_date
+    elif end_date and end_date >= today:
+        return end_date + datetime.timedelta(days=1)
+
+    return None
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
 import threading
 import datetime
+import functools
+import time
 import logging
 import async_timeout
 
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.event import async_call_later
 
 from uhppoted import uhppote
 
 _LOGGER = logging.getLogger(__name__)
-_INTERVAL = datetime.timedelta(seconds=30)
+_INTERVAL = datetime.timedelta(seconds=300)
+_DOOR_CONTROL_INTERVAL = datetime.timedelta(seconds=300)
+_REASON_DOOR_OPEN = 23
+_REASON_DOOR_CLOSED = 24
+_UNLOCK_TIMEOUT = 5  # seconds
 
 from ..const import CONF_DOOR_ID
 from ..const import CONF_CONTROLLER_SERIAL_NUMBER
@@ -24,28 +32,37 @@ from ..const import ATTR_DOOR_MODE
 from ..const import ATTR_DOOR_BUTTON
 from ..const import ATTR_DOOR_LOCK
 from ..const import ATTR_DOOR_OPEN
+from ..const import EVENT_REASON_DOOR_UNLOCKED
 
 from ..config import get_configured_controllers_ext
 from ..config import get_configured_doors
-from ..config import resolve_door
-from ..config import resolve_door_by_name
+from ..config import Topology
 
 from ..uhppoted import Controller
+from .metrics import Metrics
+from .metrics import elapsed
 
 
 class DoorsCoordinator(DataUpdateCoordinator):
     _state: Dict[str, Dict]
 
-    def __init__(self, hass, options, poll, driver, db):
+    def __init__(self, hass, options, poll, poll_door_control, driver, db, status):
         interval = _INTERVAL if poll == None else poll
 
         super().__init__(hass, _LOGGER, name="doors", update_interval=interval)
 
         self._options = options
         self._controllers = get_configured_controllers_ext(options)
+        self._controllers_by_id = {v.id: v for v in self._controllers}
+        self._topology = Topology(options)
         self._uhppote = driver
         self._db = db
+        self._status = status
         self._state = {}
+        self._door_control = {}
+        self._door_control_interval = _DOOR_CONTROL_INTERVAL if poll_door_control == None else poll_door_control
+        self._pending = {}
+        self._metrics = Metrics()
         self._initialised = False
 
         _LOGGER.info(f'doors coordinator initialised ({interval.total_seconds():.0f}s)')
@@ -54,42 +71,116 @@ class DoorsCoordinator(DataUpdateCoordinator):
         self.unload()
 
     def unload(self):
-        pass
+        for (_, cancel, _) in self._pending.values():
+            cancel()
+
+        self._pending = {}
 
     def set_door_mode(self, controller_id, door, mode):
         controller = self._resolve(controller_id)
 
-        response = self._uhppote.get_door_control(controller.id, door)
-        if response.controller == controller.id and response.door == door:
-            delay = response.delay
-            response = self._uhppote.set_door_control(controller.id, door, mode, delay)
-
-            if response.controller != controller.id or response.door != door:
-                raise ValueError(f'invalid response to set-door-control')
-            else:
-                return response
+        control = self._get_door_control(controller.id, door)
+        if control:
+            (_, delay) = control
+            return self._set_door_control(controller.id, door, mode, delay)
 
         return None
 
     def set_door_delay(self, controller_id, door, delay):
         controller = self._resolve(controller_id)
 
-        response = self._uhppote.get_door_control(controller.id, door)
-        if response.controller == controller.id and response.door == door:
-            mode = response.mode
-            response = self._uhppote.set_door_control(controller.id, door, mode, delay)
+        control = self._get_door_control(controller.id, door)
+        if control:
+            (mode, _) = control
+            return self._set_door_control(controller.id, door, mode, delay)
+
+        return None
+
+    def set_doors(self, doors=None, controllers=None, all=False, mode=None, delay=None):
+        selected = set()
+
+        if all:
+            selected.update(self._topology.all_doors())
 
-            if response.controller != controller.id or response.door != door:
-                raise ValueError(f'invalid response to set-door-control')
+        for v in controllers or []:
+            selected.update(self._topology.doors(int(f'{v}')))
+
+        for name in doors or []:
+            idx = self._topology.unique_id(name)
+            if idx:
+                selected.add(idx)
             else:
-                return response
+                _LOGGER.warning(f'unknown door {name}')
 
-        return None
+        # ... group by controller
+        grouped = {}
+        for idx in selected:
+            door = self._topology.door(idx)
+            grouped.setdefault(door[CONF_CONTROLLER_SERIAL_NUMBER], []).append((idx, door))
+
+        lock = threading.Lock()
+        results = {}
+        updated = {}
+
+        def f(controller_id):
+            controller = self._resolve(controller_id)
+            for idx, door in grouped[controller_id]:
+                name = door[CONF_DOOR_ID]
+                door_id = door[CONF_DOOR_NUMBER]
+                try:
+                    m = mode
+                    d = delay
+                    if m is None or d is None:
+                        control = self._get_door_control(controller.id, door_id)
+                        if not control:
+                            raise ValueError(f'invalid response to get-door-control')
+
+                        m = control[0] if m is None else m
+                        d = control[1] if d is None else d
+
+                    response = self._set_door_control(controller.id, door_id, m, d)
+
+                    with lock:
+                        results[idx] = {
+                            'name': name,
+                            'controller': controller.id,
+                            'door': door_id,
+                            'mode': response.mode,
+                            'delay': response.delay,
+                            'ok': True,
+                        }
+
+                        updated[idx] = (response.mode, response.delay)
+
+                except Exception as err:
+                    _LOGGER.error(f'error setting door {name} mode/delay ({err})')
+                    with lock:
+                        results[idx] = {
+                            'name': name,
+                            'controller': controller.id,
+                            'door': door_id,
+                            'ok': False,
+                            'error': f'{err}',
+                        }
+
+        if grouped:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(grouped)) as executor:
+                list(executor.map(f, grouped.keys()))
+
+        # NTS: set_doors runs in a worker thread so the door state is updated on the event loop
+        if updated:
+            self.hass.loop.call_soon_threadsafe(self._set_door_control_state, updated)
+
+        return results
+
+    def metrics(self):
+        return self._metrics.snapshot()
 
     def unlock_door(self, controller_id, door) -> None:
         controller = self._resolve(controller_id)
 
-        response = self._uhppote.open_door(controller.id, door)
+        with self._metrics.timed('unlock.open-door'):
+            response = self._uhppote.open_door(controller.id, door)
 
         if response.controller != controller.id:
             raise ValueError(f'invalid response to open-door')
@@ -97,15 +188,162 @@ class DoorsCoordinator(DataUpdateCoordinator):
             return response
 
     def unlock_door_by_name(self, door):
-        record = resolve_door_by_name(self._options, door)
+        start = time.perf_counter()
+
+        with self._metrics.timed('unlock.resolve'):
+            unique_id = self._topology.unique_id(door)
+            record = self._topology.door(unique_id)
+
         if record:
             controller = self._resolve(record[CONF_CONTROLLER_SERIAL_NUMBER])
             doorno = record[CONF_DOOR_NUMBER]
-            response = self.unlock_door(controller.id, doorno)
-            return response.opened
+            key = (controller.id, doorno)
+
+            # NTS: service calls run in the executor - the unlock is confirmed on the event loop (as for
+            #      async_unlock_door) so that the confirm and state-write stages are recorded for both paths
+            self.hass.loop.call_soon_threadsafe(self._expect, key, unique_id, start)
+
+            opened = False
+            try:
+                response = self.unlock_door(controller.id, doorno)
+                opened = response.opened
+                self._metrics.record('unlock.service', elapsed(start))
+                return opened
+            finally:
+                if not opened:
+                    asyncio.run_coroutine_threadsafe(self._unconfirmed(key), self.hass.loop)
+
+        return False
+
+    async def async_unlock_door(self, unique_id):
+        start = time.perf_counter()
+
+        with self._metrics.timed('unlock.resolve'):
+            door = self._topology.door(unique_id)
+
+        if door:
+            controller = self._resolve(door[CONF_CONTROLLER_SERIAL_NUMBER])
+            key = (controller.id, door[CONF_DOOR_NUMBER])
+
+            self._expect(key, unique_id, start)
+            self.hass.async_create_task(self._async_open_door(key))
+
+            return True
 
         return False
 
+    def _expect(self, key, unique_id, start):
+        self._cancel(key)
+
+        timeout = async_call_later(self.hass, _UNLOCK_TIMEOUT, functools.partial(self._on_unlock_timeout, key))
+        self._pending[key] = (unique_id, timeout, start)
+
+    async def _async_open_door(self, key):
+        (controller_id, door) = key
+        try:
+            response = await self.hass.async_add_executor_job(self.unlock_door, controller_id, door)
+            if not response.opened:
+                _LOGGER.warning(f'controller {controller_id} did not unlock door {door}')
+                await self._unconfirmed(key)
+        except Exception as err:
+            _LOGGER.error(f'error unlocking controller {controller_id} door {door} ({err})')
+            await self._unconfirmed(key)
+
+    async def _on_unlock_timeout(self, key, _now):
+        _LOGGER.debug(f'no unlock event for controller {key[0]} door {key[1]} - polling door status')
+        await self._unconfirmed(key)
+
+    async def _unconfirmed(self, key):
+        pending = self._pending.pop(key, None)
+        if pending:
+            (unique_id, cancel, start) = pending
+            cancel()
+            await self.async_refresh_door(unique_id)
+            self._metrics.record('unlock.unconfirmed', elapsed(start))
+
+    def _cancel(self, key):
+        pending = self._pending.pop(key, None)
+        if pending:
+            (_, cancel, _) = pending
+            cancel()
+
+    def _confirm(self, key):
+        pending = self._pending.pop(key, None)
+        if pending:
+            (_, cancel, start) = pending
+            cancel()
+            self._metrics.record('unlock.confirm', elapsed(start))
+            return pending[0]
+
+        return None
+
+    def on_events(self, events):
+        updated = set()
+        confirmed = set()
+
+        for (event, status) in events:
+            self._on_event(event, status, updated, confirmed)
+
+        if updated:
+            self._db.doors = self._state
+            if confirmed & updated:
+                with self._metrics.timed('unlock.state-write'):
+                    self._notify(updated)
+            else:
+                self._notify(updated)
+
+    def _on_event(self, event, status, updated, confirmed):
+        controller_id = event.controller
+
+        # ... confirm fire-and-forget unlocks
+        for (serial_no, door_id) in list(self._pending.keys()):
+            if serial_no == controller_id:
+                if event.door == door_id and event.reason == EVENT_REASON_DOOR_UNLOCKED:
+                    confirmed.add(self._confirm((serial_no, door_id)))
+                elif door_id in status and not status[door_id]['locked']:
+                    confirmed.add(self._confirm((serial_no, door_id)))
+
+        for idx in self._topology.doors(controller_id):
+            state = self._state.get(idx, None)
+            door = self._topology.door(idx)
+            if state is not None:
+                door_id = door[CONF_DOOR_NUMBER]
+                if door_id in status:
+                    info = {
+                        ATTR_DOOR_OPEN: status[door_id]['open'],
+                        ATTR_DOOR_BUTTON: status[door_id]['button'],
+                        ATTR_DOOR_LOCK: status[door_id]['locked'],
+                    }
+
+                    if event.door == door_id and event.reason == _REASON_DOOR_OPEN:
+                        info[ATTR_DOOR_OPEN] = True
+                    elif event.door == door_id and event.reason == _REASON_DOOR_CLOSED:
+                        info[ATTR_DOOR_OPEN] = False
+
+                    if any(state.get(k, None) != v for k, v in info.items()):
+                        state.update(info)
+                        updated.add(idx)
+
+    async def async_refresh_door(self, unique_id, control=False):
+        door = self._topology.door(unique_id)
+        if door and unique_id in self._state:
+            await self.hass.async_add_executor_job(self._refresh_door, unique_id, door, control)
+
+            self._db.doors = self._state
+            self._notify({unique_id})
+
+    def _refresh_door(self, idx, door, control):
+        lock = threading.Lock()
+        state = {}
+        controller = self._resolve(door[CONF_CONTROLLER_SERIAL_NUMBER])
+
+        self._status.invalidate(controller.id)
+        if control:
+            self._door_control.pop((controller.id, door[CONF_DOOR_NUMBER]), None)
+
+        self._get_controller(lock, state, controller)
+        self._get_door(lock, idx, door, state)
+
     async def _async_update_data(self):
         try:
             contexts = set(self.async_contexts())
@@ -132,15 +370,12 @@ class DoorsCoordinator(DataUpdateCoordinator):
         _controllers = set()
         doors = {}
         for idx in contexts:
-            door = resolve_door(self._options, idx)
+            door = self._topology.door(idx)
             if door:
                 _controllers.add(door[CONF_CONTROLLER_SERIAL_NUMBER])
                 doors[idx] = door
 
-        controllers = []
-        for controller in self._controllers:
-            if controller.id in _controllers:
-                controllers.append(controller)
+        controllers = [self._controllers_by_id[v] for v in _controllers if v in self._controllers_by_id]
 
         state = {}
         try:
@@ -160,7 +395,7 @@ class DoorsCoordinator(DataUpdateCoordinator):
         info = None
 
         try:
-            response = self._uhppote.get_status(controller.id)
+            response = self._status.get_status(controller.id)
             if response.controller == controller.id:
                 info = {
                     1: {
@@ -205,23 +440,15 @@ class DoorsCoordinator(DataUpdateCoordinator):
             controller_id = door[CONF_CONTROLLER_SERIAL_NUMBER]
             door_id = door[CONF_DOOR_NUMBER]
 
-            controller = Controller(controller_id, None, None)
-            for v in self._controllers:
-                if int(f'{v.id}') == int(f'{controller_id}'):
-                    controller = v
+            controller = self._resolve(controller_id)
 
             _LOGGER.debug(f'fetch door {name} information')
 
-            mode = None
-            delay = None
-
-            response = self._uhppote.get_door_control(controller.id, door_id)
-            if response.controller == controller.id \
-               and response.door == door_id         \
-               and controller.id in state           \
+            control = self._get_door_control(controller.id, door_id)
+            if control                    \
+               and controller.id in state \
                and state[controller.id] != None:
-                mode = response.mode
-                delay = response.delay
+                (mode, delay) = control
 
                 info = {
                     ATTR_DOOR_MODE: mode,
@@ -238,9 +465,53 @@ class DoorsCoordinator(DataUpdateCoordinator):
         with lock:
             self._state[idx].update(info)
 
+    def _get_door_control(self, controller_id, door):
+        now = datetime.datetime.now()
+        cached = self._door_control.get((controller_id, door), None)
+
+        if cached:
+            (mode, delay, timestamp) = cached
+            if now - timestamp < self._door_control_interval:
+                return (mode, delay)
+
+        response = self._uhppote.get_door_control(controller_id, door)
+        if response.controller == controller_id and response.door == door:
+            self._door_control[(controller_id, door)] = (response.mode, response.delay, now)
+            return (response.mode, response.delay)
+
+        return None
+
+    def _set_door_control(self, controller_id, door, mode, delay):
+        self._door_control.pop((controller_id, door), None)
+
+        response = self._uhppote.set_door_control(controller_id, door, mode, delay)
+        if response.controller != controller_id or response.door != door:
+            raise ValueError(f'invalid response to set-door-control')
+
+        self._door_control[(controller_id, door)] = (response.mode, response.delay, datetime.datetime.now())
+
+        return response
+
+    def _set_door_control_state(self, updated):
+        contexts = set()
+        for idx, (mode, delay) in updated.items():
+            if idx in self._state:
+                self._state[idx].update({
+                    ATTR_DOOR_MODE: mode,
+                    ATTR_DOOR_DELAY: delay,
+                })
+                contexts.add(idx)
+
+        self._notify(contexts)
+
+    def _notify(self, contexts):
+        for update_callback, context in list(self._listeners.values()):
+            if context in contexts:
+                update_callback()
+
     def _resolve(self, controller_id):
-        for controller in self._controllers:
-            if controller.id == controller_id:
-                return controller
+        controller = self._controllers_by_id.get(int(f'{controller_id}'), None)
+        if controller:
+            return controller
 
         return Controller(int(f'{controller_id}'), None, None)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import concurrent.futures
+import math
+import struct
 import threading
+import time
+from collections import deque
+from collections import OrderedDict
 from ipaddress import IPv4Address
-from dataclasses import dataclass
 
 import async_timeout
 import datetime
@@ -13,7 +17,25 @@ import asyncio
 
 _LOGGER = logging.getLogger(__name__)
 _INTERVAL = datetime.timedelta(seconds=30)
-_MAX_EVENTS = 16
+_BUDGET = 64
+_WINDOW = 4
+_CHECKPOINT_DELAY = 15  # seconds
+_JOURNAL_DELAY = 5  # seconds
+_BATCH = datetime.timedelta(milliseconds=25)
+_STREAM_SIZE = 256
+_DEDUP_WINDOW = 4096
+_VERIFY_INTERVAL = datetime.timedelta(seconds=3600)
+_CLOCK_DISCONTINUITY = datetime.timedelta(seconds=120)
+_QUEUE_SIZE = 256
+_RATE_LIMIT = 0  # events per second per controller (0 is unlimited)
+_RATE_WINDOW = 10  # seconds
+_RESUME_INTERVAL = 1  # seconds
+_INGRESS_UPDATE = 1  # seconds
+
+# NTS: v6.62 event packet layout up to the door button flags (relays are at offset 49)
+_EVENT_PACKET = struct.Struct('<BB2xIIB?BBI7sB4?4?')
+_EVENT_RELAYS = 49
+_REBIND_BACKOFF = [1, 2, 5, 10, 30, 60]  # seconds
 _MASK = {
     1: 0x01,
     2: 0x02,
@@ -23,54 +45,154 @@ _MASK = {
 
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.event import async_call_later
 
 from uhppoted import uhppote
-from uhppoted import decode
 from uhppoted.decode import unpack_uint8
 from uhppoted.decode import unpack_bool
 
 from ..const import CONF_LISTEN_ADDR
 from ..const import CONF_EVENTS_DEST_ADDR
+from ..const import CONF_CONTROLLER_SERIAL_NUMBER
+from ..const import CONF_DOOR_NUMBER
 from ..const import ATTR_AVAILABLE
 from ..const import ATTR_EVENTS
 from ..const import ATTR_STATUS
+from ..const import ATTR_EVENTS_BACKLOG
 from ..const import EVENT_REASON_DOOR_LOCKED
 from ..const import EVENT_REASON_DOOR_UNLOCKED
 from ..const import EVENT_REASON_BUTTON_RELEASED
+from ..const import EVENTS_OVERLOAD_DROP_OLDEST
+from ..const import EVENTS_OVERLOAD_COLLAPSE
+from ..const import EVENTS_OVERLOAD_PAUSE
+from ..const import CONTEXT_INGRESS
 
 from ..config import configure_cards
 from ..config import get_configured_controllers
 from ..config import get_configured_controllers_ext
+from ..config import Topology
 
 from ..uhppoted import Controller
 
 
-async def _listen(hass, addr, port, listener):
-    loop = asyncio.get_running_loop()
-    transport, protocol = await loop.create_datagram_endpoint(lambda: listener, local_addr=(addr, port))
-
-    _LOGGER.debug(f'UDP event listener {transport}')
-    _LOGGER.debug(f'UDP event listener {protocol}')
-    _LOGGER.info(f'listening for events on {addr}:{port}')
-
-
-@dataclass
 class Event:
-    controller: int
-    index: int
-    event_type: int
-    access_granted: bool
-    door: int
-    direction: int
-    card: int
-    timestamp: datetime.datetime
-    reason: int
+    __slots__ = ('controller', 'index', 'event_type', 'access_granted', 'door', 'direction', 'card', 'reason',
+                 '_timestamp', '_bcd')
+
+    def __init__(self,
+                 controller,
+                 index,
+                 event_type,
+                 access_granted,
+                 door,
+                 direction,
+                 card,
+                 timestamp,
+                 reason,
+                 bcd=None):
+        self.controller = controller
+        self.index = index
+        self.event_type = event_type
+        self.access_granted = access_granted
+        self.door = door
+        self.direction = direction
+        self.card = card
+        self.reason = reason
+        self._timestamp = timestamp
+        self._bcd = bcd
+
+    @property
+    def timestamp(self):
+        # NTS: BCD timestamps from received packets are only decoded when (and if) they are used
+        if self._bcd != None:
+            self._timestamp = _bcd_datetime(self._bcd)
+            self._bcd = None
+
+        return self._timestamp
+
+    def __repr__(self):
+        return f'Event(controller={self.controller}, index={self.index}, event_type={self.event_type}, ' \
+               f'access_granted={self.access_granted}, door={self.door}, direction={self.direction}, ' \
+               f'card={self.card}, timestamp={self.timestamp}, reason={self.reason})'
+
+
+class Seen:
+    __slots__ = ('_lock', '_size', '_indices')
+
+    def __init__(self, size=_DEDUP_WINDOW):
+        self._lock = threading.Lock()
+        self._size = size
+        self._indices = OrderedDict()
+
+    def add(self, index, timestamp=None):
+        # NTS: an index that has been seen with a different timestamp is a new event (after an event log reset)
+        with self._lock:
+            if index in self._indices and self._indices[index] == timestamp:
+                self._indices.move_to_end(index)
+                return False
+
+            self._indices[index] = timestamp
+            self._indices.move_to_end(index)
+            if len(self._indices) > self._size:
+                self._indices.popitem(last=False)
+
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._indices.clear()
+
+
+class TokenBucket:
+    __slots__ = ('_rate', '_burst', '_tokens', '_updated', '_ewma', '_denied')
+
+    def __init__(self, rate, burst):
+        self._rate = rate
+        self._burst = max(1.0, burst)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._ewma = 0.0
+        self._denied = None
+
+    def take(self):
+        now = time.monotonic()
+        dt = now - self._updated
+        self._updated = now
+
+        # NTS: the received rate is an exponentially weighted average (events/s) over _RATE_WINDOW
+        self._ewma = self._ewma * math.exp(-dt / _RATE_WINDOW) + 1.0 / _RATE_WINDOW
+
+        if self._rate <= 0:
+            return True
+
+        self._tokens = min(self._burst, self._tokens + dt * self._rate)
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+
+        self._denied = now
+        return False
+
+    def throttled(self, interval):
+        return self._denied != None and time.monotonic() - self._denied < interval
+
+    def rate(self):
+        return self._ewma * math.exp(-(time.monotonic() - self._updated) / _RATE_WINDOW)
+
+
+def _bcd_datetime(bcd):
+    s = bcd.hex()
+    try:
+        return datetime.datetime(int(s[0:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12]), int(s[12:14]))
+    except ValueError:
+        return None
 
 
 class EventListener:
 
-    def __init__(self, handler):
+    def __init__(self, handler, lost=None):
         self._handler = handler
+        self._lost = lost
         self._transport = None
 
     def connection_made(self, transport):
@@ -78,36 +200,48 @@ class EventListener:
 
     def connection_lost(self, err):
         self._transport = None
-        _LOGGER.error(f'event listener UDP connection lost {err}')
+        if err:
+            _LOGGER.error(f'event listener UDP connection lost {err}')
+        else:
+            _LOGGER.debug('event listener UDP connection closed')
+
+        if self._lost:
+            self._lost(err)
+
+    def bound(self):
+        return self._transport != None
 
     def datagram_received(self, packet, addr):
         try:
-            (event, relays, buttons) = self.decode(packet)
+            (event, relays, buttons, doors) = self.decode(packet)
             if self._handler:
-                self._handler(event, relays, buttons)
+                self._handler(event, relays, buttons, doors)
         except BaseException as err:
             _LOGGER.warning(f'Error decoding received event ({err})')
 
     def decode(self, packet):
-        evt = decode.event(packet)
+        if len(packet) != 64:
+            raise ValueError(f'invalid event packet length ({len(packet)})')
 
         # yapf: disable
-        return (Event(evt.controller,
-                      evt.event_index,
-                      evt.event_type,
-                      evt.event_access_granted,
-                      evt.event_door,
-                      evt.event_direction,
-                      evt.event_card,
-                      evt.event_timestamp,
-                      evt.event_reason),
-                evt.relays,
-                {
-                    1: evt.door_1_button,
-                    2: evt.door_2_button,
-                    3: evt.door_3_button,
-                    4: evt.door_4_button,
-                })
+        (som, function_code,
+         controller, index, event_type, access_granted, door, direction, card, timestamp, reason,
+         open1, open2, open3, open4,
+         button1, button2, button3, button4) = _EVENT_PACKET.unpack_from(packet)
+        # yapf: enable
+
+        # Ref. v6.62 firmware event
+        if som != 0x17 and (som != 0x19 or function_code != 0x20):
+            raise ValueError(f'invalid event start of message byte ({som:02x})')
+
+        if function_code != 0x20:
+            raise ValueError(f'invalid event function code ({function_code:02x})')
+
+        # yapf: disable
+        return (Event(controller, index, event_type, access_granted, door, direction, card, None, reason, timestamp),
+                packet[_EVENT_RELAYS],
+                { 1: button1, 2: button2, 3: button3, 4: button4 },
+                { 1: open1, 2: open2, 3: open3, 4: open4 })
         # yapf: enable
 
     def close(self):
@@ -115,9 +249,131 @@ class EventListener:
             self._transport.close()
 
 
+class Listeners():
+    LISTENERS = dict()
+
+    @classmethod
+    def subscribe(clazz, addr, port, controllers, handler):
+        key = (addr, port)
+        listener = Listeners.LISTENERS.get(key, None)
+        if not listener:
+            listener = Listeners.LISTENERS[key] = Listeners(addr, port)
+
+        return listener._subscribe(controllers, handler)
+
+    @classmethod
+    def get(clazz, addr, port):
+        return Listeners.LISTENERS.get((addr, port), None)
+
+    def __init__(self, addr, port):
+        self._addr = addr
+        self._port = port
+        self._handlers = {}
+        self._subscriptions = 0
+        self._listener = EventListener(self._dispatch, self._on_connection_lost)
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        self._retries = 0
+        self._rebinds = 0
+        self._rebind = None
+        self._seen = {}
+        self._received = None
+
+        asyncio.create_task(self._listen())
+
+    def status(self):
+        return {
+            'address': f'{self._addr}:{self._port}',
+            'bound': self._listener.bound(),
+            'rebinds': self._rebinds,
+            'last_event': self._received.isoformat() if self._received else None,
+            'last_index': dict(self._seen),
+        }
+
+    async def _listen(self):
+        loop = asyncio.get_running_loop()
+
+        try:
+            transport, protocol = await loop.create_datagram_endpoint(lambda: self._listener,
+                                                                      local_addr=(self._addr, self._port))
+        except Exception as err:
+            _LOGGER.error(f'error binding event listener to {self._addr}:{self._port} ({err})')
+            self._reconnect()
+            return
+
+        self._retries = 0
+
+        _LOGGER.debug(f'UDP event listener {transport}')
+        _LOGGER.debug(f'UDP event listener {protocol}')
+        _LOGGER.info(f'listening for events on {self._addr}:{self._port}')
+
+        # ... unsubscribed while binding
+        if self._closed:
+            self._listener.close()
+
+    def _on_connection_lost(self, err):
+        if not self._closed:
+            self._reconnect()
+
+    def _reconnect(self):
+        if not self._closed and not self._rebind:
+            delay = _REBIND_BACKOFF[min(self._retries, len(_REBIND_BACKOFF) - 1)]
+            self._retries += 1
+            self._rebind = self._loop.call_later(delay, self._on_rebind)
+
+            _LOGGER.warning(f'rebinding event listener {self._addr}:{self._port} in {delay}s')
+
+    def _on_rebind(self):
+        self._rebind = None
+        if not self._closed:
+            self._rebinds += 1
+            asyncio.create_task(self._listen())
+
+    def _subscribe(self, controllers, handler):
+        for controller in controllers:
+            handlers = self._handlers.setdefault(controller, [])
+            if handlers:
+                _LOGGER.warning(f'controller {controller} events are shared by multiple entries')
+            handlers.append(handler)
+
+        self._subscriptions += 1
+
+        def unsubscribe():
+            for controller in controllers:
+                handlers = self._handlers.get(controller, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+                if not handlers:
+                    self._handlers.pop(controller, None)
+
+            self._subscriptions -= 1
+            if self._subscriptions == 0:
+                Listeners.LISTENERS.pop((self._addr, self._port), None)
+                self._closed = True
+                if self._rebind:
+                    self._rebind.cancel()
+                    self._rebind = None
+                self._listener.close()
+                _LOGGER.info(f'closed event listener {self._addr}:{self._port}')
+
+        return unsubscribe
+
+    def _dispatch(self, event, relays, buttons, doors):
+        self._seen[event.controller] = event.index
+        self._received = datetime.datetime.now()
+
+        handlers = self._handlers.get(event.controller, None)
+        if handlers:
+            for handler in handlers:
+                handler(event, relays, buttons, doors)
+        else:
+            _LOGGER.debug(f'ignoring event from unconfigured controller {event.controller}')
+
+
 class EventsCoordinator(DataUpdateCoordinator):
 
-    def __init__(self, hass, options, poll, driver, db, notify):
+    def __init__(self, hass, options, poll, budget, window, driver, db, status, store, journal, batch, verify, queue,
+                 rate, policy, notify):
         interval = _INTERVAL if poll == None else poll
         addr = '0.0.0.0'
         port = 60001
@@ -128,12 +384,44 @@ class EventsCoordinator(DataUpdateCoordinator):
         self._uhppote = driver
         self._controllers = get_configured_controllers_ext(options)
         self._db = db
+        self._status = status
         self._notify = notify
+        self._store = store
+        self._journal = journal
+        self._journal_flush = None
+        self._topology = Topology(options)
+        self._subscribers = {}
+        self._streams = {}
+        self._evicted = {}
+        self._sequence = 0
+        self._batch = deque()
+        self._batch_window = _BATCH if batch == None else batch
+        self._batch_timer = None
+        self._queue_size = _QUEUE_SIZE if queue == None else max(1, queue)
+        self._rate_limit = _RATE_LIMIT if rate == None else max(0, rate)
+        self._policy = EVENTS_OVERLOAD_DROP_OLDEST if policy == None else policy
+        self._buckets = {}
+        self._ingress = {}
+        self._high_water = 0
+        self._paused = {}
+        self._resume_timer = None
+        self._overflow = []
+        self._ingress_updated = time.monotonic()
+        self._verify_interval = _VERIFY_INTERVAL if verify == None else verify
+        self._configured = {}
+        self._clocks = {}
+        self._restored = False
         self._listener_addr = options.get(CONF_EVENTS_DEST_ADDR, None)
+        self._budget = _BUDGET if budget == None else max(1, budget)
+        self._window = _WINDOW if window == None else max(1, window)
+        self._guards = {v.id: threading.Lock() for v in self._controllers}
+        self._draining = False
         self._initialised = False
         self._state = {
             'events': {},
             'index': {},
+            'target': {},
+            'seen': {},
             'relays': {},
             'buttons': {},
         }
@@ -144,9 +432,12 @@ class EventsCoordinator(DataUpdateCoordinator):
                 addr = match.group(1)
                 port = int(match.group(2))
 
-        self._listener = EventListener(self.onEvent)
+        if self._policy not in [EVENTS_OVERLOAD_DROP_OLDEST, EVENTS_OVERLOAD_COLLAPSE, EVENTS_OVERLOAD_PAUSE]:
+            _LOGGER.warning(f'invalid event overload policy ({self._policy}) - using {EVENTS_OVERLOAD_DROP_OLDEST}')
+            self._policy = EVENTS_OVERLOAD_DROP_OLDEST
 
-        asyncio.create_task(_listen(hass, addr, port, self._listener))
+        self._listen_addr = (addr, port)
+        self._unsubscribe = Listeners.subscribe(addr, port, [v.id for v in self._controllers], self.onEvent)
 
         _LOGGER.info(f'events coordinator initialised ({interval.total_seconds():.0f}s)')
 
@@ -155,33 +446,315 @@ class EventsCoordinator(DataUpdateCoordinator):
 
     def unload(self):
         try:
-            if self._listener:
-                self._listener.close()
+            if self._unsubscribe:
+                self._unsubscribe()
+                self._unsubscribe = None
         except Exception as err:
             _LOGGER.warning(f'error unloading events-coordinator ({err})')
 
-    def onEvent(self, event, relays, inputs):
-        contexts = set(self.async_contexts())
-        controller = event.controller
+        if self._batch_timer:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+
+        if self._resume_timer:
+            self._resume_timer.cancel()
+            self._resume_timer = None
+
+        # NTS: the journal itself is flushed and closed from the executor by Coordinators.async_unload
+        if self._journal_flush:
+            self._journal_flush()
+            self._journal_flush = None
+
+    def sequence(self):
+        return self._sequence
+
+    def listener(self):
+        listener = Listeners.get(*self._listen_addr)
+        if listener:
+            return listener.status()
+
+        return None
+
+    def ingress(self):
+        controllers = {}
+        for controller, counters in list(self._ingress.items()):
+            bucket = self._buckets.get(controller, None)
+            controllers[controller] = dict(counters)
+            controllers[controller]['rate'] = round(bucket.rate(), 2) if bucket else 0.0
+            controllers[controller]['paused'] = controller in self._paused
+
+        return {
+            'policy': self._policy,
+            'rate_limit': self._rate_limit,
+            'queue_size': self._queue_size,
+            'queue_depth': len(self._batch),
+            'high_water': self._high_water,
+            'controllers': controllers,
+        }
+
+    def subscribe(self, handler, controller=None, door=None, card=None):
+        key = _key(controller, door, card)
+
+        self._subscribers.setdefault(key, []).append(handler)
+        self._streams.setdefault(key, deque([], _STREAM_SIZE))
+
+        def unsubscribe():
+            handlers = self._subscribers.get(key, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+            if not handlers:
+                self._subscribers.pop(key, None)
+                self._streams.pop(key, None)
+                self._evicted.pop(key, None)
+
+        return unsubscribe
+
+    def events(self, cursor, controller=None, door=None, card=None):
+        key = _key(controller, door, card)
+        stream = self._streams.get(key, None)
+        if not stream or stream[-1][0] <= cursor:
+            return []
+
+        # NTS: sequence numbers are shared across all the streams so a gap in a stream is not an overflow - only
+        #      events evicted from a full stream that are after the cursor have been missed
+        evicted = self._evicted.get(key, 0)
+        if evicted > cursor:
+            _LOGGER.warning(f'event stream {key} overflow - skipped events {cursor + 1}-{evicted}')
+
+        return [(seq, e) for (seq, e) in stream if seq > cursor]
 
-        if controller in contexts:
-            events = [event]
-            events.extend(self.doorLocks(controller, relays))
-            events.extend(self.doorButtons(controller, inputs))
+    def query(self, controller=None, door=None, card=None, start=None, end=None, limit=100):
+        door_id = None
 
-            if not controller in self._state['index'] or self._state['index'][controller] < event.index:
-                self._state['index'][controller] = event.index
+        if door != None:
+            record = self._topology.door_by_name(door)
+            if not record:
+                return []
 
+            if controller != None and int(f'{controller}') != record[CONF_CONTROLLER_SERIAL_NUMBER]:
+                return []
+
+            controller = record[CONF_CONTROLLER_SERIAL_NUMBER]
+            door_id = record[CONF_DOOR_NUMBER]
+
+        if self._journal:
+            return self._journal.query(controller, door_id, card, start, end, limit)
+
+        return []
+
+    def onEvent(self, event, relays, inputs, doors):
+        controller = event.controller
+        counters = self._counters(controller)
+        bucket = self._buckets.get(controller, None)
+        if bucket == None:
+            bucket = self._buckets[controller] = TokenBucket(self._rate_limit, 2 * self._rate_limit)
+
+        # NTS: duplicates (listener, poll, backlog drain or UDP) are discarded before they are counted or rate
+        #      limited
+        if self._seen(controller, event):
+            return
+
+        # NTS: a new event at or below the current index means the controller event log has been reset (e.g.
+        #      cleared) - the events since the reset are fetched as backlog
+        last = self._state['index'].get(controller, None)
+        if last != None and 0 < event.index <= last:
+            _LOGGER.warning(f'controller {controller} event index reset ({last} -> {event.index})')
+            self._state['index'][controller] = 0
+            self._state['target'][controller] = event.index
+            self._state['seen'].pop(controller, None)
+            self._seen(controller, event)
+
+        counters['received'] += 1
+
+        # NTS: events from a controller exceeding its rate limit are tagged and shed according to the overload
+        #      policy when the batch is flushed
+        throttled = not bucket.take()
+        if throttled:
+            counters['throttled'] += 1
+
+        if self._policy == EVENTS_OVERLOAD_PAUSE:
+            if throttled and controller not in self._paused:
+                self._pause(controller)
+            throttled = controller in self._paused
+
+        # ... queue full: the oldest event is only recorded (journal and index) and not published
+        if len(self._batch) >= self._queue_size:
+            (oldest, *_) = self._batch.popleft()
+            self._overflow.append(oldest)
+
+        self._batch.append((event, relays, inputs, doors, throttled))
+        self._high_water = max(self._high_water, len(self._batch))
+
+        # NTS: bursts of received events are published as a single (ordered) batch per window
+        if self._batch_window.total_seconds() <= 0:
+            self._flush_batch()
+        elif not self._batch_timer:
+            self._batch_timer = self.hass.loop.call_later(self._batch_window.total_seconds(), self._flush_batch)
+
+    def _flush_batch(self):
+        self._batch_timer = None
+        batch = self._batch
+        overflow = self._overflow
+        self._batch = deque()
+        self._overflow = []
+
+        contexts = set(self.async_contexts())
+        events = []
+        shed = []
+        received = {}
+        notify = []
+
+        for event in overflow:
+            if event.controller in contexts:
+                self._advance(event.controller, event)
+                self._counters(event.controller)['dropped'] += 1
+                shed.append(event)
+
+        accepted = []
+        for (event, relays, inputs, doors, throttled) in batch:
+            if event.controller in contexts:
+                self._advance(event.controller, event)
+                accepted.append((event, relays, inputs, doors, throttled))
+
+        # NTS: a shared status snapshot taken before these events would otherwise look like an event index reset
+        for controller in {event.controller for (event, *_) in accepted}:
+            self._status.invalidate(controller)
+
+        # NTS: the most recent throttled event for a controller is published (drop-oldest) or synthesizes the
+        #      net lock/button changes for all the throttled events in the batch (collapse)
+        last = {}
+        for (ix, (event, _, _, _, throttled)) in enumerate(accepted):
+            if throttled:
+                last[event.controller] = ix
+
+        for (ix, (event, relays, inputs, doors, throttled)) in enumerate(accepted):
+            controller = event.controller
+
+            status = {}
+            for door in [1, 2, 3, 4]:
+                status[door] = {
+                    'open': doors[door] == True,
+                    'button': inputs[door] == True,
+                    'locked': relays & _MASK[door] == 0x00,
+                }
+
+            if throttled and self._policy == EVENTS_OVERLOAD_PAUSE:
+                if controller in self._paused:
+                    self._counters(controller)['deferred'] += 1
+                    self._paused[controller].append((event, status))
+                    shed.append(event)
+                    continue
+
+                throttled = False
+
+            if throttled and self._policy == EVENTS_OVERLOAD_DROP_OLDEST and last[controller] != ix:
+                self._counters(controller)['dropped'] += 1
+                shed.append(event)
+                continue
+
+            evts = [event]
+            if throttled and last[controller] != ix:
+                self._counters(controller)['collapsed'] += 1
+            else:
+                evts.extend(self.doorLocks(controller, relays, contexts))
+                evts.extend(self.doorButtons(controller, inputs, contexts))
+
+            events.extend(evts)
+            received.setdefault(controller, []).extend(evts)
+            notify.append((event, status))
+
+        self._publish(events, received, notify)
+
+        if events or shed:
+            self._checkpoint()
+            self._record(events + shed)
+
+        # NTS: the ingress counters (event rate sensors) are otherwise only updated when the events are polled
+        now = time.monotonic()
+        if now - self._ingress_updated >= _INGRESS_UPDATE:
+            self._ingress_updated = now
+            self._notify_ingress()
+
+        # ... backfill any gaps in the received event indices
+        if not self._draining and any(v > 0 for v in self.backlog().values()):
+            self._draining = True
+            self.hass.async_create_task(self._async_drain())
+
+    def _notify_ingress(self):
+        # NTS: only wakes up the event rate sensors (keyed by (CONTEXT_INGRESS, controller)) and not the event
+        #      entities, which are woken up by their own event streams
+        for update_callback, context in list(self._listeners.values()):
+            if isinstance(context, tuple) and context[0] == CONTEXT_INGRESS:
+                update_callback()
+
+    def _publish(self, events, received, notify):
+        for controller, evts in received.items():
             self._state['events'][controller] = {
                 ATTR_AVAILABLE: True,
-                ATTR_EVENTS: events,
+                ATTR_EVENTS: evts,
             }
 
+        if events:
             self._db.events = self._state['events']
-            self.async_set_updated_data(self._db.events)
+            self._dispatch(events)
+
+        if self._notify and notify:
+            self._notify(notify)
+
+    def _advance(self, controller, event):
+        # NTS: only advance the index for contiguous events - anything else is left for the backlog fetch
+        if not controller in self._state['index'] or self._state['index'][controller] + 1 == event.index:
+            self._state['index'][controller] = event.index
+        elif self._state['index'][controller] < event.index:
+            last = self._state['index'][controller]
+            _LOGGER.debug(f'controller {controller} event gap ({last} -> {event.index})')
+            self._state['target'][controller] = max(event.index, self._state['target'].get(controller, 0))
+
+    def _counters(self, controller):
+        counters = self._ingress.get(controller, None)
+        if counters == None:
+            counters = self._ingress[controller] = {
+                'received': 0,
+                'throttled': 0,
+                'dropped': 0,
+                'collapsed': 0,
+                'deferred': 0,
+            }
+
+        return counters
+
+    def _pause(self, controller):
+        _LOGGER.warning(f'controller {controller} event rate exceeds {self._rate_limit}/s - pausing entity updates')
+
+        self._paused[controller] = deque([], _STREAM_SIZE)
+        if not self._resume_timer:
+            self._resume_timer = self.hass.loop.call_later(_RESUME_INTERVAL, self._on_resume)
+
+    def _on_resume(self):
+        self._resume_timer = None
+
+        # NTS: paused controllers resume once they have stayed within the rate limit (i.e. the token bucket
+        #      that paused them) for a full resume interval and then catch up on the (most recent) deferred
+        #      events - the complete record is in the event journal
+        events = []
+        received = {}
+        notify = []
+        for controller in list(self._paused):
+            bucket = self._buckets.get(controller, None)
+            if not bucket or not bucket.throttled(_RESUME_INTERVAL):
+                deferred = self._paused.pop(controller)
+                for (event, status) in deferred:
+                    events.append(event)
+                    received.setdefault(controller, []).append(event)
+                    notify.append((event, status))
+
+                _LOGGER.warning(f'controller {controller} event rate normal - resuming entity updates')
 
-            if self._notify:
-                self._notify(event)
+        self._publish(events, received, notify)
+
+        if self._paused:
+            self._resume_timer = self.hass.loop.call_later(_RESUME_INTERVAL, self._on_resume)
 
     async def _async_update_data(self):
         try:
@@ -192,11 +765,76 @@ class EventsCoordinator(DataUpdateCoordinator):
                 contexts.update(controllers)
                 self._initialised = True
 
+            if not self._restored:
+                await self._restore()
+
             async with async_timeout.timeout(2.5):
                 return await self._get_events(contexts)
         except Exception as err:
             raise UpdateFailed(f'uhppoted API error {err}')
 
+    async def _restore(self):
+        self._restored = True
+
+        try:
+            if self._store:
+                checkpoint = await self._store.async_load()
+                if checkpoint and 'index' in checkpoint:
+                    for k, v in checkpoint['index'].items():
+                        self._state['index'].setdefault(int(k), int(v))
+
+                    _LOGGER.info(f'restored event index checkpoint {checkpoint["index"]}')
+        except Exception as err:
+            _LOGGER.warning(f'error restoring event index checkpoint ({err})')
+
+    def _dispatch(self, events):
+        # NTS: appends each event to the matching card, door and controller streams and then wakes up only
+        #      the subscribers for those streams, which drain all pending events from their own cursors
+        updated = set()
+        for e in events:
+            self._sequence += 1
+            for key in [('card', e.card), ('door', e.controller, e.door), ('controller', e.controller)]:
+                stream = self._streams.get(key, None)
+                if stream != None:
+                    if len(stream) == stream.maxlen:
+                        self._evicted[key] = stream[0][0]
+                    stream.append((self._sequence, e))
+                    updated.add(key)
+
+        for key in updated:
+            for handler in list(self._subscribers.get(key, [])):
+                try:
+                    handler()
+                except Exception as err:
+                    _LOGGER.warning(f'error dispatching {key} events ({err})')
+
+    def _record(self, events=None):
+        # NTS: journal writes are batched and flushed from the executor
+        if self._journal:
+            if events:
+                self._journal.append(events)
+
+            if not self._journal_flush and self._journal.pending() > 0:
+                self._journal_flush = async_call_later(self.hass, _JOURNAL_DELAY, self._async_flush_journal)
+
+    async def _async_flush_journal(self, _now):
+        self._journal_flush = None
+
+        try:
+            await self.hass.async_add_executor_job(self._journal.flush)
+        except Exception as err:
+            _LOGGER.warning(f'error writing event journal ({err})')
+
+    def _checkpoint(self):
+        # NTS: coalesces updates into a single delayed write (and is flushed on Home Assistant shutdown)
+        if self._store:
+            self._store.async_delay_save(lambda: {
+                'index': {
+                    f'{k}': v
+                    for k, v in self._state['index'].items()
+                },
+            }, _CHECKPOINT_DELAY)
+
     async def _get_events(self, contexts):
         lock = threading.Lock()
 
@@ -207,16 +845,203 @@ class EventsCoordinator(DataUpdateCoordinator):
 
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                executor.map(lambda controller: self._record_special_events(lock, controller), controllers, timeout=1)
-                executor.map(lambda controller: self._set_event_listener(lock, controller), controllers, timeout=1)
-                executor.map(lambda controller: self._get_controller_events(lock, controller), controllers, timeout=1)
+                executor.map(lambda controller: self._get_controller_events(lock, controller, contexts),
+                             controllers,
+                             timeout=1)
         except Exception as err:
             _LOGGER.error(f'error retrieving event information ({err})')
 
+        # NTS: controller event setup is only (re)applied on startup, after a reboot and at the verify interval
+        now = datetime.datetime.now()
+        unconfigured = []
+        for controller in controllers:
+            configured = self._configured.get(controller.id, None)
+            if configured == None or now - configured > self._verify_interval:
+                unconfigured.append(controller)
+
+        try:
+            if unconfigured:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                    executor.map(lambda controller: self._configure(lock, controller), unconfigured, timeout=1)
+        except Exception as err:
+            _LOGGER.error(f'error configuring controller events ({err})')
+
         self._db.events = self._state['events']
+        self._checkpoint()
+        self._record()
+
+        for controller in controllers:
+            if controller.id in self._state['events']:
+                self._dispatch(self._state['events'][controller.id].get(ATTR_EVENTS, []))
+
+        if not self._draining and any(v > 0 for v in self.backlog().values()):
+            self._draining = True
+            self.hass.async_create_task(self._async_drain())
 
         return self._db.events
 
+    def backlog(self):
+        backlog = {}
+        for controller, target in list(self._state['target'].items()):
+            index = self._state['index'].get(controller, target)
+            backlog[controller] = max(0, target - index)
+
+        return backlog
+
+    async def _async_drain(self):
+        try:
+            while True:
+                pending = {}
+                for controller_id, backlog in self.backlog().items():
+                    if backlog > 0:
+                        last = self._state['index'].get(controller_id, 0)
+                        pending[controller_id] = (last, self._state['target'][controller_id])
+
+                if not pending:
+                    break
+
+                drained = await self.hass.async_add_executor_job(self._drain, pending)
+
+                # NTS: the fetched events and indices are applied on the event loop - the listener may have
+                #      advanced (or reset) the index while the events were being fetched
+                progress = False
+                events = []
+                for controller_id, (evts, ix) in drained.items():
+                    last = pending[controller_id][0]
+                    index = self._state['index'].get(controller_id, 0)
+
+                    if ix != None and ix > last and index >= last:
+                        self._state['index'][controller_id] = max(index, ix)
+                        progress = True
+
+                    if evts:
+                        self._state['events'][controller_id] = {
+                            ATTR_AVAILABLE: True,
+                            ATTR_EVENTS: evts,
+                            ATTR_EVENTS_BACKLOG: self.backlog().get(controller_id, 0),
+                        }
+                        events.extend(evts)
+
+                if events:
+                    self._db.events = self._state['events']
+                    self._dispatch(events)
+
+                self._checkpoint()
+                self._record(events)
+
+                if not progress:
+                    break
+
+        except Exception as err:
+            _LOGGER.error(f'error fetching missed events ({err})')
+
+        finally:
+            self._draining = False
+
+    def _drain(self, pending):
+        # NTS: runs in the executor and only fetches the missed events - the coordinator state is updated by
+        #      _async_drain on the event loop
+        lock = threading.Lock()
+        drained = {}
+
+        def f(controller_id):
+            (last, target) = pending[controller_id]
+            (events, ix) = self._fetch_range(controller_id, last, min(target, last + self._budget))
+            with lock:
+                drained[controller_id] = (events, ix)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(f, pending))
+
+        return drained
+
+    def _fetch_events(self, controller_id, index):
+        events = []
+        last = self._state['index'].get(controller_id, None)
+        self._state['target'][controller_id] = max(index, self._state['target'].get(controller_id, index))
+
+        if last == None:
+            self._state['index'][controller_id] = index
+            self._state['target'][controller_id] = index
+        elif last > index:
+            # NTS: the events since the reset (1..index) are fetched as backlog
+            _LOGGER.warning(f'controller {controller_id} event index reset ({last} -> {index})')
+            self._state['index'][controller_id] = 0
+            self._state['target'][controller_id] = index
+            self._state['seen'].pop(controller_id, None)
+        else:
+            end = min(self._state['target'][controller_id], last + self._budget)
+            (events, ix) = self._fetch_range(controller_id, last, end)
+            if ix != None:
+                self._state['index'][controller_id] = ix
+
+        return events
+
+    def _fetch_range(self, controller_id, last, end):
+        guard = self._guards.setdefault(controller_id, threading.Lock())
+        events = []
+        ix = last
+
+        # NTS: a poll and a background drain never fetch the same controller's backlog concurrently
+        if not guard.acquire(blocking=False):
+            return (events, None)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self._window) as executor:
+                while ix < end:
+                    indices = list(range(ix + 1, min(ix + self._window, end) + 1))
+                    responses = executor.map(lambda v: self._get_event(controller_id, v), indices)
+
+                    ok = True
+                    for next, (fetched, response) in zip(indices, responses):
+                        if not fetched:
+                            ok = False
+                            break
+
+                        if response != None:
+                            event = self.decode(response, None)
+                            if not self._seen(controller_id, event):
+                                events.append(event)
+                        else:
+                            _LOGGER.warning(f'controller {controller_id} missing event {next}')
+
+                        ix = next
+
+                    if not ok:
+                        break
+
+        finally:
+            guard.release()
+
+        return (events, ix)
+
+    def _seen(self, controller_id, event):
+        if event.index > 0:
+            seen = self._state['seen'].get(controller_id, None)
+            if seen == None:
+                seen = self._state['seen'].setdefault(controller_id, Seen())
+
+            return not seen.add(event.index, event.timestamp)
+
+        return False
+
+    def _get_event(self, controller_id, index):
+        try:
+            response = self._uhppote.get_event(controller_id, index)
+            if response.controller == controller_id and response.index == index:
+                return (True, response)
+
+            return (True, None)
+
+        except Exception as err:
+            _LOGGER.warning(f'error retrieving controller {controller_id} event {index} ({err})')
+            return (False, None)
+
+    def _configure(self, lock, controller):
+        if self._record_special_events(lock, controller) and self._set_event_listener(lock, controller):
+            with lock:
+                self._configured[controller.id] = datetime.datetime.now()
+
     def _record_special_events(self, lock, controller):
         _LOGGER.debug(f'enable controller {controller.id} record special events')
 
@@ -224,24 +1049,30 @@ class EventsCoordinator(DataUpdateCoordinator):
             response = self._uhppote.record_special_events(controller.id, True)
             if response.controller == controller.id:
                 if not response.updated:
-                    _LOGGER.warning('record special events not enabled for {controller.id}')
+                    _LOGGER.warning(f'record special events not enabled for {controller.id}')
+                else:
+                    return True
 
         except Exception as err:
             _LOGGER.warning(f'error enabling controller {controller} record special events ({err})')
 
+        return False
+
     def _set_event_listener(self, lock, controller):
         if self._listener_addr != None:
             _LOGGER.debug(f'check controller {controller.id} event listener')
 
             match = re.match(r'^[0-9.]+:[0-9]+$', f'{self._listener_addr}')
             if match == None:
-                return
+                return True
 
             try:
                 response = self._uhppote.get_listener(controller.id)
                 if response.controller == controller.id:
                     addr = f'{response.address}:{response.port}'
-                    if addr != self._listener_addr:
+                    if addr == self._listener_addr:
+                        return True
+                    else:
                         _LOGGER.warning(f'controller {controller.id} incorrect event listener address ({addr})')
                         host, port = self._listener_addr.split(':')
                         response = self._uhppote.set_listener(controller.id, IPv4Address(host), int(port))
@@ -250,13 +1081,39 @@ class EventsCoordinator(DataUpdateCoordinator):
                                 _LOGGER.warning(
                                     f'controller {controller.id} event listener address updated ({self._listener_addr})'
                                 )
+                                return True
                             else:
                                 _LOGGER.warning(f'failed to set controller {controller.id} event listener address')
 
             except Exception as err:
                 _LOGGER.warning(f'error setting controller {controller.id} event listener ({err})')
 
-    def _get_controller_events(self, lock, controller):
+            return False
+
+        return True
+
+    def _rebooted(self, controller_id, response):
+        rebooted = False
+
+        last = self._state['index'].get(controller_id, None)
+        if last != None and response.event_index < last:
+            rebooted = True
+
+        # NTS: a controller clock that jumps relative to the local clock is (usually) a reboot or a reset
+        if response.system_date and response.system_time:
+            offset = datetime.datetime.combine(response.system_date, response.system_time) - datetime.datetime.now()
+            previous = self._clocks.get(controller_id, None)
+            self._clocks[controller_id] = offset
+            if previous != None and abs(offset - previous) > _CLOCK_DISCONTINUITY:
+                rebooted = True
+
+        if rebooted and controller_id in self._configured:
+            _LOGGER.warning(f'controller {controller_id} restarted - reapplying event configuration')
+            self._configured.pop(controller_id, None)
+
+        return rebooted
+
+    def _get_controller_events(self, lock, controller, contexts):
         _LOGGER.debug(f'fetch controller {controller.id} events')
 
         info = {
@@ -265,7 +1122,7 @@ class EventsCoordinator(DataUpdateCoordinator):
         }
 
         try:
-            response = self._uhppote.get_status(controller.id)
+            response = self._status.get_status(controller.id)
             if response.controller == controller.id:
                 info[ATTR_STATUS] = response
                 index = response.event_index
@@ -276,30 +1133,19 @@ class EventsCoordinator(DataUpdateCoordinator):
                     3: response.door_3_button,
                     4: response.door_4_button,
                 }
-                events = []
 
-                if not controller.id in self._state['index']:
-                    self._state['index'][controller.id] = index
-                elif self._state['index'][controller.id] >= index:
-                    self._state['index'][controller.id] = index
-                else:
-                    count = 0
-                    ix = self._state['index'][controller.id]
-                    while ix < index and count < _MAX_EVENTS:
-                        count += 1
-                        next = ix + 1
-                        response = self._uhppote.get_event(controller.id, next)
-                        if response.controller == controller.id and response.index == next:
-                            event = self.decode(response, relays)
-                            events.append(event)
-                            ix = response.index
-
-                    self._state['index'][controller.id] = ix
-
-                events.extend(self.doorLocks(controller.id, relays))
-                events.extend(self.doorButtons(controller.id, buttons))
+                self._rebooted(controller.id, response)
+
+                events = self._fetch_events(controller.id, index)
+
+                events.extend(self.doorLocks(controller.id, relays, contexts))
+                events.extend(self.doorButtons(controller.id, buttons, contexts))
 
                 info[ATTR_EVENTS] = events
+
+                if self._journal:
+                    self._journal.append(events)
+                info[ATTR_EVENTS_BACKLOG] = self.backlog().get(controller.id, 0)
                 info[ATTR_AVAILABLE] = True
 
         except Exception as err:
@@ -321,8 +1167,7 @@ class EventsCoordinator(DataUpdateCoordinator):
                      evt.reason)
         # yapf: enable
 
-    def doorLocks(self, controller_id, relays):
-        contexts = set(self.async_contexts())
+    def doorLocks(self, controller_id, relays, contexts):
         events = []
 
         if controller_id in contexts:
@@ -339,8 +1184,7 @@ class EventsCoordinator(DataUpdateCoordinator):
 
         return events
 
-    def doorButtons(self, controller_id, buttons):
-        contexts = set(self.async_contexts())
+    def doorButtons(self, controller_id, buttons, contexts):
         events = []
 
         if controller_id in contexts:
@@ -363,3 +1207,12 @@ class EventsCoordinator(DataUpdateCoordinator):
                 return controller
 
         return Controller(int(f'{controller_id}'), None, None)
+
+
+def _key(controller=None, door=None, card=None):
+    if card != None:
+        return ('card', card)
+    elif door != None:
+        return ('door', controller, door)
+    else:
+        return ('controller', controller)
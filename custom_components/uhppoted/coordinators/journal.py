@@ -0,0 +1,185 @@
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+
+from typing import List
+
+_LOGGER = logging.getLogger(__name__)
+_MAX_AGE = datetime.timedelta(days=365)
+_MAX_ROWS = 1000000
+_PRUNE_INTERVAL = datetime.timedelta(hours=1)
+_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS events (
+           controller     INTEGER NOT NULL,
+           idx            INTEGER NOT NULL,
+           timestamp      TEXT,
+           event_type     INTEGER,
+           access_granted INTEGER,
+           door           INTEGER,
+           direction      INTEGER,
+           card           INTEGER,
+           reason         INTEGER)''',
+    # NTS: event indices are reused after a controller event log reset so the timestamp is part of the key
+    'DROP INDEX IF EXISTS events_index',
+    "CREATE UNIQUE INDEX IF NOT EXISTS events_key ON events (controller, idx, IFNULL(timestamp, '')) WHERE idx > 0",
+    'CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp)',
+    'CREATE INDEX IF NOT EXISTS events_controller ON events (controller, timestamp)',
+    'CREATE INDEX IF NOT EXISTS events_door ON events (controller, door, timestamp)',
+    'CREATE INDEX IF NOT EXISTS events_card ON events (card, timestamp)',
+]
+
+
+class Journal:
+    _lock: threading.Lock
+    _db_lock: threading.Lock
+    _pending: List[tuple]
+
+    @classmethod
+    def delete(clazz, path):
+        for f in [path, f'{path}-wal', f'{path}-shm']:
+            try:
+                os.remove(f)
+                _LOGGER.info(f'deleted event journal {f}')
+            except FileNotFoundError:
+                pass
+
+    def __init__(self, path, max_age=None, max_rows=None):
+        self._path = path
+        self._max_age = _MAX_AGE if max_age == None else max_age
+        self._max_rows = _MAX_ROWS if max_rows == None else max_rows
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending = []
+        self._db = None
+        self._pruned = None
+
+    def append(self, events):
+        rows = [_row(e) for e in events]
+        with self._lock:
+            self._pending.extend(rows)
+
+        return len(rows)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        # NTS: _lock only guards the pending rows (appended from the event loop) - the SQLite writes, prunes
+        #      and queries are serialised by _db_lock, which is never taken on the event loop
+        with self._lock:
+            rows = self._pending
+            self._pending = []
+
+        if rows:
+            with self._db_lock:
+                db = self._open()
+                with db:
+                    db.executemany('INSERT OR IGNORE INTO events VALUES (?,?,?,?,?,?,?,?,?)', rows)
+
+                self._prune(db)
+
+        return len(rows)
+
+    def query(self, controller=None, door=None, card=None, start=None, end=None, limit=100):
+        clauses = []
+        args = []
+
+        if controller != None:
+            clauses.append('controller = ?')
+            args.append(controller)
+
+        if door != None:
+            clauses.append('door = ?')
+            args.append(door)
+
+        if card != None:
+            clauses.append('card = ?')
+            args.append(card)
+
+        if start != None:
+            clauses.append('timestamp >= ?')
+            args.append(start.strftime(_FORMAT))
+
+        if end != None:
+            clauses.append('timestamp <= ?')
+            args.append(end.strftime(_FORMAT))
+
+        sql = 'SELECT * FROM events'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+
+        sql += ' ORDER BY timestamp DESC, idx DESC LIMIT ?'
+        args.append(limit)
+
+        self.flush()
+
+        with self._db_lock:
+            rows = self._open().execute(sql, args).fetchall()
+
+        return [{
+            'controller': row[0],
+            'index': row[1],
+            'timestamp': row[2],
+            'event_type': row[3],
+            'access_granted': None if row[4] == None else row[4] != 0,
+            'door': row[5],
+            'direction': row[6],
+            'card': row[7],
+            'reason': row[8],
+        } for row in rows]
+
+    def close(self):
+        with self._db_lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+    def _open(self):
+        if self._db == None:
+            db = sqlite3.connect(self._path, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            with db:
+                for sql in _SCHEMA:
+                    db.execute(sql)
+
+            self._db = db
+            _LOGGER.info(f'opened event journal {self._path}')
+
+        return self._db
+
+    def _prune(self, db):
+        now = datetime.datetime.now()
+        if self._pruned != None and now - self._pruned < _PRUNE_INTERVAL:
+            return
+
+        self._pruned = now
+
+        try:
+            with db:
+                cutoff = (now - self._max_age).strftime(_FORMAT)
+                db.execute('DELETE FROM events WHERE timestamp < ?', (cutoff, ))
+                db.execute('DELETE FROM events WHERE rowid <= (SELECT MAX(rowid) FROM events) - ?', (self._max_rows, ))
+        except Exception as err:
+            _LOGGER.warning(f'error pruning event journal ({err})')
+
+
+def _row(event):
+    timestamp = event.timestamp.strftime(_FORMAT) if event.timestamp != None else None
+    access_granted = None if event.access_granted == None else int(event.access_granted == True)
+
+    # yapf: disable
+    return (event.controller,
+            event.index,
+            timestamp,
+            event.event_type,
+            access_granted,
+            event.door,
+            event.direction,
+            event.card,
+            event.reason)
+    # yapf: enable
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict
+from typing import List
+
+# NTS: log-scaled bucket upper bounds (milliseconds) - the last bucket is unbounded
+_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class Histogram:
+    _lock: threading.Lock
+    _counts: List[int]
+
+    def __init__(self, buckets=_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+    def record(self, ms):
+        ix = len(self._buckets)
+        for i, bound in enumerate(self._buckets):
+            if ms <= bound:
+                ix = i
+                break
+
+        with self._lock:
+            self._counts[ix] += 1
+            self._count += 1
+            self._sum += ms
+            self._min = ms if self._min is None else min(self._min, ms)
+            self._max = ms if self._max is None else max(self._max, ms)
+
+    def percentile(self, q):
+        with self._lock:
+            return self._percentile(q)
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {f'{v}ms': n for v, n in zip(self._buckets, self._counts)}
+            buckets['+inf'] = self._counts[-1]
+
+            return {
+                'count': self._count,
+                'min': self._min,
+                'max': self._max,
+                'mean': self._sum / self._count if self._count > 0 else None,
+                'p50': self._percentile(0.50),
+                'p95': self._percentile(0.95),
+                'p99': self._percentile(0.99),
+                'buckets': buckets,
+            }
+
+    def _percentile(self, q):
+        if self._count == 0:
+            return None
+
+        # NTS: reports the bucket upper bound, clamped to the observed maximum
+        target = q * self._count
+        cumulative = 0
+        for i, n in enumerate(self._counts):
+            cumulative += n
+            if cumulative >= target and n > 0:
+                if i < len(self._buckets):
+                    return min(self._buckets[i], self._max)
+                return self._max
+
+        return self._max
+
+
+class Metrics:
+    _lock: threading.Lock
+    _histograms: Dict[str, Histogram]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.setdefault(name, Histogram())
+
+        histogram.record(ms)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, elapsed(start))
+
+    def snapshot(self):
+        with self._lock:
+            histograms = dict(self._histograms)
+
+        return {k: v.snapshot() for k, v in sorted(histograms.items())}
+
+
+def elapsed(start):
+    return (time.perf_counter() - start) * 1000.0
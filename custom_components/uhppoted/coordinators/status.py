@@ -0,0 +1,41 @@
+import threading
+import datetime
+
+from typing import Dict
+
+_MAX_AGE = datetime.timedelta(milliseconds=5000)
+
+
+class Status:
+    _lock: threading.Lock
+    _locks: Dict[int, threading.Lock]
+    _snapshots: Dict[int, tuple]
+
+    def __init__(self, driver):
+        self._uhppote = driver
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._snapshots = {}
+
+    def get_status(self, controller, max_age=_MAX_AGE):
+        with self._lock:
+            lock = self._locks.setdefault(controller, threading.Lock())
+
+        # NTS: concurrent requests for the same controller wait for the in-flight request
+        with lock:
+            now = datetime.datetime.now()
+            snapshot = self._snapshots.get(controller, None)
+
+            if snapshot:
+                (timestamp, response) = snapshot
+                if now - timestamp <= max_age:
+                    return response
+
+            response = self._uhppote.get_status(controller)
+            if response.controller == controller:
+                self._snapshots[controller] = (datetime.datetime.now(), response)
+
+            return response
+
+    def invalidate(self, controller):
+        self._snapshots.pop(controller, None)
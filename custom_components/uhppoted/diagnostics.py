@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+
+from .coordinators.coordinators import Coordinators
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    diagnostics = {}
+
+    doors = Coordinators.doors(entry.entry_id)
+    if doors:
+        diagnostics['doors'] = {
+            'latency': doors.metrics(),
+        }
+
+    events = Coordinators.events(entry.entry_id)
+    if events:
+        diagnostics['events'] = {
+            'backlog': events.backlog(),
+            'listener': events.listener(),
+            'ingress': events.ingress(),
+        }
+
+    return diagnostics
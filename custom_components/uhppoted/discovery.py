@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+
+from .const import CONF_BIND_ADDR
+from .const import CONF_BROADCAST_ADDR
+from .const import CONF_LISTEN_ADDR
+from .const import CONF_DEBUG
+
+from .config import get_broadcast_addresses
+from .uhppoted import uhppoted
+
+_LOGGER = logging.getLogger(__name__)
+_TTL = datetime.timedelta(seconds=300)
+
+
+class Discovery():
+    CACHE = dict()
+
+    @classmethod
+    async def get_all_controllers(clazz, hass, options):
+        bind = options[CONF_BIND_ADDR]
+        broadcast = options[CONF_BROADCAST_ADDR]
+        listen = options[CONF_LISTEN_ADDR]
+        debug = options[CONF_DEBUG]
+
+        key = (bind, broadcast, listen)
+        cached = Discovery.CACHE.get(key, None)
+
+        if cached is None:
+            cached = {
+                'controllers': None,
+                'addresses': {},
+                'timestamp': None,
+                'task': None,
+            }
+
+            Discovery.CACHE[key] = cached
+
+        # ... first use (or no successful scan yet): wait for scan
+        if cached['timestamp'] is None:
+            if cached['task'] is None:
+                cached['task'] = hass.async_create_task(Discovery._scan(hass, cached, bind, broadcast, listen, debug))
+
+            await asyncio.shield(cached['task'])
+
+        # ... stale: return cached list and rescan in the background
+        elif datetime.datetime.now() - cached['timestamp'] > _TTL:
+            if cached['task'] is None:
+                cached['task'] = hass.async_create_task(Discovery._scan(hass, cached, bind, broadcast, listen, debug))
+
+        return list((cached['controllers'] or {}).values())
+
+    @staticmethod
+    async def _scan(hass, cached, bind, broadcast, listen, debug):
+        try:
+            addresses = [broadcast]
+            for v in await hass.async_add_executor_job(get_broadcast_addresses):
+                addr = f'{v}:60000'
+                if addr not in addresses:
+                    addresses.append(addr)
+
+            f = lambda addr: uhppoted.get_all_controllers(bind, addr, listen, debug)
+            responses = await asyncio.gather(*[hass.async_add_executor_job(f, addr) for addr in addresses],
+                                             return_exceptions=True)
+
+            # ... rebuild from the current responses, keeping the previous results only for the broadcast
+            #     addresses that failed
+            found = {}
+            ok = False
+            for addr, response in zip(addresses, responses):
+                if isinstance(response, Exception):
+                    _LOGGER.warning(f'error retrieving list of controllers on {addr} ({response})')
+                    if addr in cached['addresses']:
+                        found[addr] = cached['addresses'][addr]
+                else:
+                    ok = True
+                    found[addr] = {}
+                    for v in response:
+                        found[addr][v.controller] = {
+                            'controller': v.controller,
+                            'address': f'{v.ip_address}',
+                        }
+
+            controllers = {}
+            for v in found.values():
+                controllers.update(v)
+
+            cached['addresses'] = found
+            cached['controllers'] = controllers
+
+            # NTS: the timestamp is left unchanged if every scan failed so that the next call rescans
+            if ok:
+                cached['timestamp'] = datetime.datetime.now()
+
+        except Exception as err:
+            _LOGGER.exception(f'error retrieving list of controllers ({err})')
+
+            if cached['controllers'] is None:
+                cached['controllers'] = {}
+
+        finally:
+            cached['task'] = None
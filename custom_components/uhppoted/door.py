@@ -1,5 +1,4 @@
 from __future__ import annotations
-from collections import deque
 
 import logging
 
@@ -27,7 +26,6 @@ from .const import EVENT_REASON_DOOR_LOCKED
 from .const import EVENT_REASON_DOOR_UNLOCKED
 from .const import EVENT_REASON_BUTTON_RELEASED
 
-from .const import ATTR_EVENTS
 from .const import ATTR_STATUS
 
 _REASON_BUTTON_PRESSED = 20
@@ -358,8 +356,8 @@ class DoorOpened(CoordinatorEntity, EventEntity):
         self.door = door
         self._name = f'uhppoted.door.{door}.open.event'.lower()
         self._door_id = int(f'{door_id}')
-        self._events = deque([], 16)
         self._available = False
+        self._cursor = 0
 
     @property
     def unique_id(self) -> str:
@@ -373,42 +371,44 @@ class DoorOpened(CoordinatorEntity, EventEntity):
     def available(self) -> bool:
         return self._available
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._cursor = self.coordinator.sequence()
+        self.async_on_remove(self.coordinator.subscribe(self._on_events, controller=self.serial_no, door=self._door_id))
+
+    @callback
+    def _on_events(self):
+        for (seq, e) in self.coordinator.events(self._cursor, controller=self.serial_no, door=self._door_id):
+            self._cursor = seq
+            if e.reason == _REASON_DOOR_OPEN:
+                self._trigger_event('OPENED')
+                self.async_write_ha_state()
+            elif e.reason == _REASON_DOOR_CLOSED:
+                self._trigger_event('CLOSED')
+                self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self._update()
+        self._on_events()
         self.async_write_ha_state()
 
     async def async_update(self):
         self._update()
 
     def _update(self):
-        _LOGGER.debug(f'controller:{self.controller}  update door {self.door}.open.event')
+        _LOGGER.debug(f'controller:{self.controller} update door {self.door}.open.event state')
         try:
             if self.coordinator.data:
                 idx = self.serial_no
-                door = self._door_id
 
                 if idx not in self.coordinator.data:
                     self._available = False
-                elif ATTR_EVENTS not in self.coordinator.data[idx]:
-                    self._available = False
                 elif not self.coordinator.data[idx][ATTR_AVAILABLE]:
                     self._available = False
                 else:
-                    events = self.coordinator.data[idx][ATTR_EVENTS]
-                    for e in events:
-                        if e.door == door and e.reason == _REASON_DOOR_OPEN:
-                            self._events.appendleft('OPENED')
-                        if e.door == door and e.reason == _REASON_DOOR_CLOSED:
-                            self._events.appendleft('CLOSED')
-
                     self._available = True
 
-                # ... because Home Assistant coalesces multiple events in an update cycle
-                if len(self._events) > 0:
-                    event = self._events.pop()
-                    self._trigger_event(event)
-
         except (Exception):
             self._available = False
             _LOGGER.exception(f'error retrieving controller {self.controller} events')
@@ -430,8 +430,8 @@ class DoorButtonPressed(CoordinatorEntity, EventEntity):
         self.door = door
         self._name = f'uhppoted.door.{door}.button.event'.lower()
         self._door_id = int(f'{door_id}')
-        self._events = deque([], 16)
         self._available = False
+        self._cursor = 0
 
     @property
     def unique_id(self) -> str:
@@ -445,9 +445,26 @@ class DoorButtonPressed(CoordinatorEntity, EventEntity):
     def available(self) -> bool:
         return self._available
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._cursor = self.coordinator.sequence()
+        self.async_on_remove(self.coordinator.subscribe(self._on_events, controller=self.serial_no, door=self._door_id))
+
+    @callback
+    def _on_events(self):
+        for (seq, e) in self.coordinator.events(self._cursor, controller=self.serial_no, door=self._door_id):
+            self._cursor = seq
+            if e.reason == _REASON_BUTTON_PRESSED:
+                self._trigger_event('PRESSED')
+                self.async_write_ha_state()
+            elif e.reason == _REASON_BUTTON_RELEASED:
+                self._trigger_event('RELEASED')
+                self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self._update()
+        self._on_events()
         self.async_write_ha_state()
 
     async def async_update(self):
@@ -458,29 +475,14 @@ class DoorButtonPressed(CoordinatorEntity, EventEntity):
         try:
             if self.coordinator.data:
                 idx = self.serial_no
-                door = self._door_id
 
                 if idx not in self.coordinator.data:
                     self._available = False
                 elif not self.coordinator.data[idx][ATTR_AVAILABLE]:
                     self._available = False
                 else:
-                    if ATTR_EVENTS in self.coordinator.data[idx]:
-                        events = self.coordinator.data[idx][ATTR_EVENTS]
-                        for e in events:
-                            if e.door == door and e.reason == _REASON_BUTTON_PRESSED:
-                                self._events.appendleft('PRESSED')
-
-                            if e.door == door and e.reason == _REASON_BUTTON_RELEASED:
-                                self._events.appendleft('RELEASED')
-
                     self._available = True
 
-                # ... because Home Assistant coalesces multiple events in an update cycle
-                if len(self._events) > 0:
-                    event = self._events.pop()
-                    self._trigger_event(event)
-
         except (Exception):
             self._available = False
             _LOGGER.exception(f'error retrieving controller {self.controller} events')
@@ -502,8 +504,8 @@ class DoorUnlocked(CoordinatorEntity, EventEntity):
         self.door = door
         self._name = f'uhppoted.door.{door}.unlocked.event'.lower()
         self._door_id = int(f'{door_id}')
-        self._events = deque([], 16)
         self._available = False
+        self._cursor = 0
 
     @property
     def unique_id(self) -> str:
@@ -517,9 +519,26 @@ class DoorUnlocked(CoordinatorEntity, EventEntity):
     def available(self) -> bool:
         return self._available
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._cursor = self.coordinator.sequence()
+        self.async_on_remove(self.coordinator.subscribe(self._on_events, controller=self.serial_no, door=self._door_id))
+
+    @callback
+    def _on_events(self):
+        for (seq, e) in self.coordinator.events(self._cursor, controller=self.serial_no, door=self._door_id):
+            self._cursor = seq
+            if e.reason == _REASON_DOOR_LOCKED:
+                self._trigger_event('LOCKED')
+                self.async_write_ha_state()
+            elif e.reason == _REASON_DOOR_UNLOCKED:
+                self._trigger_event('UNLOCKED')
+                self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self._update()
+        self._on_events()
         self.async_write_ha_state()
 
     async def async_update(self):
@@ -530,31 +549,17 @@ class DoorUnlocked(CoordinatorEntity, EventEntity):
         try:
             if self.coordinator.data:
                 idx = self.serial_no
-                door = self._door_id
 
                 if idx not in self.coordinator.data:
                     self._available = False
                 elif not self.coordinator.data[idx][ATTR_AVAILABLE]:
                     self._available = False
                 else:
-                    if ATTR_EVENTS in self.coordinator.data[idx]:
-                        events = self.coordinator.data[idx][ATTR_EVENTS]
-                        for e in events:
-                            if e.door == door and e.reason == _REASON_DOOR_LOCKED:
-                                self._events.appendleft('LOCKED')
-                            elif e.door == door and e.reason == _REASON_DOOR_UNLOCKED:
-                                self._events.appendleft('UNLOCKED')
-
                     self._available = True
 
-                # ... because Home Assistant coalesces multiple events in an update cycle
-                if len(self._events) > 0:
-                    event = self._events.pop()
-                    self._trigger_event(event)
-
         except (Exception):
             self._available = False
-            _LOGGER.exception(f'error retrieving controller {self.controller} status')
+            _LOGGER.exception(f'error retrieving controller {self.controller} events')
 
 
 class DoorMode(CoordinatorEntity, SelectEntity):
@@ -621,7 +626,7 @@ class DoorMode(CoordinatorEntity, SelectEntity):
             response = self.coordinator.set_door_mode(controller, door, mode)
 
             if response:
-                await self.coordinator.async_request_refresh()
+                await self.coordinator.async_refresh_door(self._unique_id)
 
         except (Exception):
             self._available = False
@@ -703,7 +708,7 @@ class DoorDelay(CoordinatorEntity, NumberEntity):
             response = self.coordinator.set_door_delay(controller, door, delay)
 
             if response:
-                await self.coordinator.async_request_refresh()
+                await self.coordinator.async_refresh_door(self._unique_id)
 
         except (Exception):
             self._available = False
@@ -766,17 +771,10 @@ class DoorUnlock(CoordinatorEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         try:
-            controller = self._serial_no
-            door = self._door_id
-            response = self.coordinator.unlock_door(controller, door)
-
-            if response:
-                if response.opened:
-                    _LOGGER.info(f'unlocked door {self.door}')
-                else:
-                    _LOGGER.info(f'unable to unlock door {self.door}')
-
-                await self.coordinator.async_request_refresh()
+            if await self.coordinator.async_unlock_door(self._unique_id):
+                _LOGGER.info(f'unlocking door {self.door}')
+            else:
+                _LOGGER.warning(f'unable to unlock door {self.door}')
 
         except (Exception):
             _LOGGER.exception(f'error unlocking door {self.door}')
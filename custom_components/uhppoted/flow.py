@@ -24,6 +24,7 @@ from .const import DEFAULT_CONTROLLER_TIMEZONE
 from .config import validate_controller_id
 from .config import validate_all_controllers
 from .config import get_all_controllers
+from .discovery import Discovery
 
 
 class UhppotedFlow:
@@ -37,10 +38,11 @@ class UhppotedFlow:
         self._defaults = self.hass.data.get(DOMAIN, {})
         self._timezone = defaults.get(CONF_TIMEZONE, DEFAULT_CONTROLLER_TIMEZONE)
 
-    def _get_all_controllers(self, options):
+    async def _get_all_controllers(self, options):
         preconfigured = self._defaults.get(CONF_CONTROLLERS, [])
+        discovered = await Discovery.get_all_controllers(self.hass, options)
 
-        return get_all_controllers(preconfigured, options)
+        return get_all_controllers(preconfigured, options, discovered)
 
     def step_controllers(self, controllers, selected, options, user_input, cache):
         errors: Dict[str, str] = {}
@@ -202,7 +202,7 @@ class UhppotedOptionsFlow(UhppotedFlow, OptionsFlow):
         return self.async_show_form(step_id="events", data_schema=schema, errors=errors)
 
     async def async_step_controllers(self, user_input: Optional[Dict[str, Any]] = None):
-        controllers = self._get_all_controllers(self.options)
+        controllers = await self._get_all_controllers(self.options)
         if len(controllers) < 1:
             return await self.async_step_door()
 
@@ -420,7 +420,8 @@ class UhppotedOptionsFlow(UhppotedFlow, OptionsFlow):
 
                 return await self.async_step_card()
 
-        cards = get_all_cards(self.options, self._max_cards, self._preferred_cards)
+        cards = await self.hass.async_add_executor_job(get_all_cards, self.options, self._max_cards,
+                                                       self._preferred_cards, self.cache)
         defaults = [f'{v[CONF_CARD_NUMBER]}' for v in self.options.get(CONF_CARDS, [])]
 
         select = SelectSelectorConfig(options=[g(v) for v in cards],
@@ -23,6 +23,7 @@ from .config import configure_cards
 from .coordinators.coordinators import Coordinators
 
 from .controller import ControllerInfo
+from .controller import ControllerEventRate
 from .door import DoorInfo
 from .door import DoorOpen
 from .door import DoorLock
@@ -36,11 +37,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     controllers = Coordinators.controllers(entry.entry_id)
     doors = Coordinators.doors(entry.entry_id)
     cards = Coordinators.cards(entry.entry_id)
+    events = Coordinators.events(entry.entry_id)
     entities = []
 
     def f(unique_id, controller, serial_no, address):
         entities.extend([
             ControllerInfo(controllers, unique_id, controller, serial_no),
+            ControllerEventRate(events, unique_id, controller, serial_no),
         ])
 
     def g(unique_id, controller, serial_no, door, door_no):
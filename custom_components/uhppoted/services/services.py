@@ -1,10 +1,26 @@
 from __future__ import annotations
 from collections import deque
 
+import datetime
 import logging
 import re
+import voluptuous as vol
 
 _LOGGER = logging.getLogger(__name__)
+_DOOR_MODES = {
+    'UNLOCKED': 1,
+    'LOCKED': 2,
+    'CONTROLLED': 3,
+}
+
+from homeassistant.core import SupportsResponse
+
+_SET_DOORS_SCHEMA = vol.Schema(
+    {
+        vol.Optional('mode'): vol.All(vol.Coerce(str), vol.Strip, vol.Upper, vol.In(list(_DOOR_MODES.keys()))),
+        vol.Optional('delay'): vol.All(vol.Coerce(int), vol.Range(min=1, max=255)),
+    },
+    extra=vol.ALLOW_EXTRA)
 
 from ..const import DOMAIN
 from ..coordinators.coordinators import Coordinators
@@ -17,6 +33,15 @@ class Services():
     def initialise(clazz, hass, id, options):
         if not Services.SERVICES:
             hass.services.async_register(DOMAIN, "unlock_door", lambda v: unlock_door(v))
+            hass.services.async_register(DOMAIN,
+                                         "set_doors",
+                                         lambda v: set_doors(v),
+                                         schema=_SET_DOORS_SCHEMA,
+                                         supports_response=SupportsResponse.OPTIONAL)
+            hass.services.async_register(DOMAIN,
+                                         "query_events",
+                                         lambda v: query_events(v),
+                                         supports_response=SupportsResponse.ONLY)
             hass.services.async_register(DOMAIN, "add_card", lambda v: add_card(v))
             hass.services.async_register(DOMAIN, "delete_card", lambda v: delete_card(v))
 
@@ -28,6 +53,8 @@ class Services():
 
         if not Services.SERVICES:
             hass.services.async_remove(DOMAIN, 'unlock_door')
+            hass.services.async_remove(DOMAIN, 'set_doors')
+            hass.services.async_remove(DOMAIN, 'query_events')
             hass.services.async_remove(DOMAIN, 'add_card')
             hass.services.async_remove(DOMAIN, 'delete_card')
 
@@ -46,6 +73,84 @@ def unlock_door(call):
         _LOGGER.warning(f'error executing unlock-door service call ({err})')
 
 
+def set_doors(call):
+    _LOGGER.debug('service call:set-doors %s', call.data)
+
+    try:
+        doors = call.data.get('doors', None)
+        controllers = call.data.get('controllers', None)
+        all = call.data.get('all', False) == True
+        mode = call.data.get('mode', None)
+        delay = call.data.get('delay', None)
+
+        if isinstance(doors, str):
+            doors = [doors]
+
+        if isinstance(controllers, (str, int)):
+            controllers = [controllers]
+
+        if mode is not None:
+            mode = _DOOR_MODES[mode]
+
+        if mode is None and delay is None:
+            _LOGGER.warning('service call:set-doors requires a door mode and/or delay')
+            return {}
+
+        results = Coordinators.set_doors(doors, controllers, all, mode, delay)
+        modes = {v: k for k, v in _DOOR_MODES.items()}
+        for v in results.values():
+            if 'mode' in v:
+                v['mode'] = modes.get(v['mode'], v['mode'])
+
+        ok = len([v for v in results.values() if v['ok']])
+        _LOGGER.info(f'service call:set-doors updated {ok} of {len(results)} doors')
+
+        return {'doors': results}
+
+    except Exception as err:
+        _LOGGER.warning(f'error executing set-doors service call ({err})')
+
+    return {}
+
+
+def query_events(call):
+    _LOGGER.debug('service call:query-events %s', call.data)
+
+    try:
+        controller = call.data.get('controller', None)
+        door = call.data.get('door', None)
+        card = call.data.get('card', None)
+        days = call.data.get('days', None)
+        start = call.data.get('start', None)
+        end = call.data.get('end', None)
+        limit = int(f'{call.data.get("limit", 100)}')
+
+        if controller is not None:
+            controller = int(f'{controller}')
+
+        if card is not None:
+            card = int(f'{card}')
+
+        if days is not None:
+            start = datetime.datetime.now() - datetime.timedelta(days=float(f'{days}'))
+        elif start is not None:
+            start = datetime.datetime.fromisoformat(f'{start}')
+
+        if end is not None:
+            end = datetime.datetime.fromisoformat(f'{end}')
+
+        events = Coordinators.query_events(controller, door, card, start, end, limit)
+
+        _LOGGER.info(f'service call:query-events returned {len(events)} events')
+
+        return {'events': events}
+
+    except Exception as err:
+        _LOGGER.warning(f'error executing query-events service call ({err})')
+
+    return {'events': []}
+
+
 def add_card(call):
     _LOGGER.debug('service call:add-card', call.data)
 